@@ -1,7 +1,25 @@
+import operator
+import re
+import time
+from collections import OrderedDict, defaultdict
+from functools import reduce
+
 from django.contrib import messages
-from django.contrib.messages.storage.base import Message
+from django.contrib.messages.storage.base import BaseStorage
 from django.core import mail
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import DateTimeField, Q
 from django.http import HttpResponsePermanentRedirect, HttpResponseRedirect
+from django.test.utils import CaptureQueriesContext
+
+from djet import timing
+from djet.messages import RecordedMessage
+
+try:
+    from django.db.models import JSONField
+except ImportError:  # Django < 3.1
+    JSONField = None
 
 
 class StatusCodeAssertionsMixin(object):
@@ -20,8 +38,7 @@ class StatusCodeAssertionsMixin(object):
                 status_code,
             )
             if response.status_code >= 400 and show_body_on_error:
-                response.render()
-                message += "\n. App responded:\n" + response.content
+                message += "\n. App responded:\n" + self._get_response_body(response)
             raise AssertionError(message)
 
     def assert_status_in(
@@ -34,10 +51,16 @@ class StatusCodeAssertionsMixin(object):
                 ", ".join(str(code) for code in status_codes),
             )
             if response.status_code >= 400 and show_body_on_error:
-                response.render()
-                message += "\n. App responded:\n" + response.content
+                message += "\n. App responded:\n" + self._get_response_body(response)
             raise AssertionError(message)
 
+    def _get_response_body(self, response):
+        if not getattr(response, "is_rendered", True):
+            response.render()
+        if getattr(response, "streaming", False):
+            return "<streaming content>"
+        return response.content.decode(response.charset, "replace")
+
     def _get_redirect_assertion_message(self, response):
         return "Response should redirect, but status code is {0}".format(
             response.status_code
@@ -79,6 +102,152 @@ class StatusCodeAssertionsMixin(object):
             return status_code_or_response
 
 
+def _get_attachment_name(attachment):
+    if isinstance(attachment, tuple):
+        return attachment[0]
+    return attachment.get_filename()
+
+
+def _get_attachment_size(attachment):
+    if isinstance(attachment, tuple):
+        return len(attachment[1])
+    return len(attachment.get_payload(decode=True) or b"")
+
+
+def _compile_regex_lookup(value):
+    pattern = re.compile(value)
+    return lambda actual: pattern.search(actual) is not None
+
+
+def _compile_icontains_lookup(value):
+    value = value.lower()
+    return lambda actual: value in actual.lower()
+
+
+_EMAIL_LOOKUPS = {
+    "exact": lambda value: lambda actual: actual == value,
+    "contains": lambda value: lambda actual: value in actual,
+    "icontains": _compile_icontains_lookup,
+    "startswith": lambda value: lambda actual: actual.startswith(value),
+    "endswith": lambda value: lambda actual: actual.endswith(value),
+    "regex": _compile_regex_lookup,
+    "in": lambda value: lambda actual: actual in value,
+    "gt": lambda value: lambda actual: actual > value,
+    "gte": lambda value: lambda actual: actual >= value,
+    "lt": lambda value: lambda actual: actual < value,
+    "lte": lambda value: lambda actual: actual <= value,
+}
+
+_EMAIL_ATTRIBUTES = {
+    "attachment_names": lambda email: [
+        _get_attachment_name(attachment) for attachment in email.attachments
+    ],
+    "attachment_sizes": lambda email: [
+        _get_attachment_size(attachment) for attachment in email.attachments
+    ],
+    "attachment_count": lambda email: len(email.attachments),
+}
+
+
+class _EmailMatcher(object):
+    """
+    A single ``attribute__lookup=value`` criterion compiled into a predicate.
+
+    Lookups other than ``exact`` on list attributes (``to``, ``cc``,
+    ``attachment_names``...) match when any item matches, ``contains`` and
+    ``icontains`` compare whole items there.
+    """
+
+    def __init__(self, key, value):
+        self.key = key
+        self.value = value
+        self.attribute, self.lookup = key, "exact"
+        if "__" in key:
+            attribute, lookup = key.rsplit("__", 1)
+            if lookup not in _EMAIL_LOOKUPS:
+                raise ValueError("Unsupported email lookup: {0}".format(key))
+            self.attribute, self.lookup = attribute, lookup
+        self.test = self.item_test = _EMAIL_LOOKUPS[self.lookup](value)
+        if self.lookup == "contains":
+            self.item_test = _EMAIL_LOOKUPS["exact"](value)
+        elif self.lookup == "icontains":
+            self.item_test = lambda item: item.lower() == value.lower()
+
+    def get_actual(self, email):
+        if self.attribute in _EMAIL_ATTRIBUTES:
+            return _EMAIL_ATTRIBUTES[self.attribute](email)
+        return getattr(email, self.attribute)
+
+    def matches(self, email):
+        actual = self.get_actual(email)
+        if self.lookup != "exact" and isinstance(actual, (list, tuple)):
+            return any(self.item_test(item) for item in actual)
+        return self.test(actual)
+
+
+def _compile_email_criteria(criteria):
+    return [_EmailMatcher(key, value) for key, value in criteria.items()]
+
+
+def _email_index_key(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+class _OutboxIndex(object):
+    """
+    Positions of ``mail.outbox`` emails by value of their most commonly
+    asserted attributes. Emails appended since the last lookup are indexed
+    incrementally; a replaced, shrunk or cleared outbox is indexed from
+    scratch.
+    """
+
+    attributes = ("to", "cc", "bcc", "reply_to", "from_email", "subject")
+
+    def __init__(self):
+        self.outbox = None
+        self.size = 0
+        self.last = None
+        self.positions = {}
+
+    def _is_stale(self, outbox):
+        if outbox is not self.outbox or len(outbox) < self.size:
+            return True
+        # Cleared in place and refilled since the last lookup.
+        return bool(self.size) and outbox[self.size - 1] is not self.last
+
+    def update(self):
+        outbox = mail.outbox
+        if self._is_stale(outbox):
+            self.outbox = outbox
+            self.size = 0
+            self.positions = {attribute: {} for attribute in self.attributes}
+        for position in range(self.size, len(outbox)):
+            email = outbox[position]
+            for attribute in self.attributes:
+                key = _email_index_key(getattr(email, attribute, None))
+                self.positions[attribute].setdefault(key, []).append(position)
+        self.size = len(outbox)
+        self.last = outbox[-1] if outbox else None
+
+    def candidates(self, criteria):
+        """
+        Returns emails that may match ``criteria`` based on indexed
+        attributes, and the criteria that still have to be checked on them.
+        """
+        positions = None
+        remaining = {}
+        for key, value in criteria.items():
+            try:
+                matched = self.positions[key].get(_email_index_key(value), [])
+            except (KeyError, TypeError):
+                remaining[key] = value
+                continue
+            positions = set(matched) if positions is None else positions & set(matched)
+        if positions is None:
+            positions = range(self.size)
+        return [self.outbox[position] for position in sorted(positions)], remaining
+
+
 class EmailAssertionsMixin(object):
     def assert_emails_in_mailbox(self, count):
         self.assertEqual(
@@ -91,10 +260,8 @@ class EmailAssertionsMixin(object):
         )
 
     def _is_email_matching_criteria(self, email, **kwargs):
-        for key, value in kwargs.items():
-            if getattr(email, key) != value:
-                return False
-        return True
+        matchers = _compile_email_criteria(kwargs)
+        return all(matcher.matches(email) for matcher in matchers)
 
     def assert_email(self, email, **kwargs):
         for key, value in kwargs.items():
@@ -109,16 +276,172 @@ class EmailAssertionsMixin(object):
                 ),
             )
 
-    def assert_email_exists(self, **kwargs):
+    def _find_emails(self, **kwargs):
+        try:
+            outbox_index = self._outbox_index
+        except AttributeError:
+            outbox_index = self._outbox_index = _OutboxIndex()
+        outbox_index.update()
+        emails, remaining = outbox_index.candidates(kwargs)
+        matchers = _compile_email_criteria(remaining)
+        return [
+            email
+            for email in emails
+            if all(matcher.matches(email) for matcher in matchers)
+        ]
+
+    def _describe_near_misses(self, limit=3, **kwargs):
+        """
+        Describes emails matching most (but not all) of the criteria and
+        which criteria they fail.
+        """
+        matchers = _compile_email_criteria(kwargs)
+        near_misses = []
         for email in mail.outbox:
-            if self._is_email_matching_criteria(email, **kwargs):
-                return
-        raise AssertionError("Email matching criteria was not sent")
+            failed = [matcher for matcher in matchers if not matcher.matches(email)]
+            if failed and len(failed) < len(matchers):
+                near_misses.append((len(failed), email, failed))
+        near_misses.sort(key=lambda near_miss: near_miss[0])
+
+        lines = []
+        for _, email, failed in near_misses[:limit]:
+            lines.append(
+                "Email {0!r} to {1} fails: {2}".format(
+                    email.subject,
+                    email.to,
+                    ", ".join(
+                        "{0}={1!r} (got {2!r})".format(
+                            matcher.key, matcher.value, matcher.get_actual(email)
+                        )
+                        for matcher in failed
+                    ),
+                )
+            )
+        return "\n".join(lines)
+
+    def assert_email_exists(self, **kwargs):
+        """
+        Checks if an email matching the criteria was sent. Besides equality
+        criteria support lookups: ``exact``, ``contains``, ``icontains``,
+        ``startswith``, ``endswith``, ``regex``, ``in``, ``gt``, ``gte``,
+        ``lt`` and ``lte``, also on ``attachment_names``, ``attachment_sizes``
+        and ``attachment_count``.
+
+        For example::
+
+        >>> self.assert_email_exists(
+        ...     to__contains='you@example.com',
+        ...     subject__regex=r'^Order #\\d+',
+        ...     attachment_names__endswith='.pdf',
+        ... )
+        """
+        if not self._find_emails(**kwargs):
+            message = "Email matching criteria was not sent"
+            near_misses = self._describe_near_misses(**kwargs)
+            if near_misses:
+                message += ". Closest matches:\n" + near_misses
+            raise AssertionError(message)
+
+    def assert_email_count_matching(self, count, **kwargs):
+        """
+        Checks if exactly ``count`` emails matching the criteria were sent.
+        """
+        matched = len(self._find_emails(**kwargs))
+        if matched != count:
+            message = "There is {0} e-mails matching criteria, expected {1}".format(
+                matched,
+                count,
+            )
+            near_misses = self._describe_near_misses(**kwargs)
+            if near_misses:
+                message += ". Closest matches:\n" + near_misses
+            raise AssertionError(message)
+
+    def assert_emails_exist(self, criteria_list):
+        """
+        Checks if an email matching each of the criteria dicts was sent,
+        reporting all criteria without a matching email at once.
+
+        For example::
+
+        >>> self.assert_emails_exist([
+        ...     {'to': ['alice@example.com'], 'subject': 'Welcome'},
+        ...     {'to': ['bob@example.com'], 'subject': 'Welcome'},
+        ... ])
+        """
+        missing = [
+            criteria for criteria in criteria_list if not self._find_emails(**criteria)
+        ]
+        if missing:
+            raise AssertionError(
+                "No email matching {0} of {1} criteria was sent: {2}".format(
+                    len(missing),
+                    len(criteria_list),
+                    ", ".join(str(criteria) for criteria in missing),
+                )
+            )
+
+
+def _get_recorded_messages(request):
+    """
+    Returns messages sent with ``request`` as ``RecordedMessage`` tuples,
+    without marking the storage as used.
+    """
+    storage = messages.get_messages(request)
+    if not isinstance(storage, BaseStorage):
+        # No message storage attached to the request.
+        return []
+    records = getattr(storage, "records", None)
+    if records is not None:
+        return records
+    used = storage.used
+    try:
+        return [
+            RecordedMessage(message.level, str(message.message), message.tags)
+            for message in storage
+        ]
+    finally:
+        storage.used = used
+
+
+class _MessageMatcher(object):
+    def __init__(self, level=None, message=None, tags=None, contains=None):
+        self.level = level
+        self.message = message
+        self.tags = set(tags.split()) if tags else set()
+        self.contains = contains
+
+    def __str__(self):
+        return ", ".join(
+            "{0}={1!r}".format(name, value)
+            for name, value in [
+                ("level", self.level),
+                ("message", self.message),
+                ("tags", " ".join(sorted(self.tags)) or None),
+                ("contains", self.contains),
+            ]
+            if value is not None
+        )
+
+    def matches(self, record):
+        if self.level is not None and record.level != self.level:
+            return False
+        if self.message is not None and record.message != self.message:
+            return False
+        if self.contains is not None and self.contains not in record.message:
+            return False
+        return self.tags.issubset(record.tags.split())
 
 
 class MessagesAssertionsMixin(object):
+    """
+    Assertions about messages sent with a request. They don't consume the
+    messages and are fastest with ``djet.messages.InMemoryMessageStorage``
+    (attached by ``self.factory.get(messages=True)``), which records them.
+    """
+
     def assert_messages_sent(self, request, count):
-        sent = len(messages.get_messages(request))
+        sent = len(_get_recorded_messages(request))
         self.assertEqual(
             sent,
             count,
@@ -128,34 +451,298 @@ class MessagesAssertionsMixin(object):
             ),
         )
 
-    def assert_message_exists(self, request, level, message):
-        self.assertIn(
-            Message(level=level, message=message),
-            messages.get_messages(request),
-            "Message matching criteria does not exist",
-        )
+    def assert_message_exists(
+        self, request, level=None, message=None, tags=None, contains=None
+    ):
+        matcher = _MessageMatcher(level, message, tags, contains)
+        if not any(map(matcher.matches, _get_recorded_messages(request))):
+            raise AssertionError(
+                "Message matching criteria does not exist: {0}".format(matcher)
+            )
+
+    def assert_message_count_matching(
+        self, request, count, level=None, message=None, tags=None, contains=None
+    ):
+        matcher = _MessageMatcher(level, message, tags, contains)
+        matching = sum(map(matcher.matches, _get_recorded_messages(request)))
+        if matching != count:
+            raise AssertionError(
+                "There was {0} messages matching {1}, expected {2}.".format(
+                    matching, matcher, count
+                )
+            )
+
+
+_NOT_GIVEN = object()
+
+
+def _get_template_names(template):
+    if isinstance(template, str):
+        return [template]
+    if isinstance(template, (list, tuple)):
+        return [name for item in template for name in _get_template_names(item)]
+    # Template objects, either of a backend or of the Django engine.
+    template = getattr(template, "template", template)
+    return [template.name]
+
+
+class ContextAssertionsMixin(object):
+    """
+    Assertions inspecting template responses (e.g. returned by ``self.view``)
+    without rendering them.
+    """
+
+    def _get_context_data(self, response):
+        context_data = getattr(response, "context_data", None)
+        if context_data is None:
+            raise AssertionError(
+                "Response has no context data, is it a TemplateResponse?"
+            )
+        return context_data
+
+    def assert_context_contains(self, response, key, value=_NOT_GIVEN):
+        context_data = self._get_context_data(response)
+        if key not in context_data:
+            raise AssertionError(
+                "Context does not contain {0!r}, it contains: {1}".format(
+                    key, ", ".join(sorted(map(repr, context_data)))
+                )
+            )
+        if value is not _NOT_GIVEN and context_data[key] != value:
+            raise AssertionError(
+                "Context {0!r} is {1!r}, expected {2!r}".format(
+                    key, context_data[key], value
+                )
+            )
+
+    def assert_context_not_contains(self, response, key):
+        if key in self._get_context_data(response):
+            raise AssertionError("Context contains {0!r}".format(key))
+
+    def assert_template_used(self, response, template_name):
+        template = getattr(response, "template_name", None)
+        if template is None:
+            raise AssertionError("Response has no template, is it a TemplateResponse?")
+        template_names = _get_template_names(template)
+        if template_name not in template_names:
+            raise AssertionError(
+                "Template {0!r} was not used, templates: {1}".format(
+                    template_name, ", ".join(map(repr, template_names))
+                )
+            )
 
 
 class _InstanceContext(object):
     """
-    Context manager returned by assert_instance_created/deleted.
+    Context manager returned by assert_instance(s)_created/deleted.
     """
 
-    def __init__(self, enter_assertion, exit_assertion, model_class, **kwargs):
+    def __init__(self, enter_assertion, exit_assertion, model_class, *args, **kwargs):
         self.enter_assertion = enter_assertion
         self.exit_assertion = exit_assertion
         self.model_class = model_class
+        self.args = args
         self.kwargs = kwargs
 
     def __enter__(self):
-        self.enter_assertion(self.model_class, **self.kwargs)
+        self.enter_assertion(self.model_class, *self.args, **self.kwargs)
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.exit_assertion(self.model_class, **self.kwargs)
+        self.exit_assertion(self.model_class, *self.args, **self.kwargs)
         return True
 
 
+# Fields whose values can't be compared in Python like in the database: time
+# zone handling makes datetimes unreliable and JSON values aren't hashable.
+_UNPLAIN_FIELDS = tuple(
+    field for field in (DateTimeField, JSONField) if field is not None
+)
+
+
+def _get_plain_criteria(model_class, criteria):
+    """
+    Translates ``criteria`` into ``{attname: value}`` when it only contains
+    exact lookups with hashable values on concrete fields of
+    ``model_class``, so it can be matched in Python. Returns None otherwise.
+
+    Python equality may differ from the database collation, e.g. text is
+    compared case-sensitively even where the database (like MySQL by
+    default) doesn't.
+    """
+    plain = {}
+    for key, value in criteria.items():
+        name = key[: -len("__exact")] if key.endswith("__exact") else key
+        if name == "pk":
+            name = model_class._meta.pk.name
+        try:
+            field = model_class._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if not getattr(field, "concrete", False) or field.many_to_many:
+            return None
+        if isinstance(field, _UNPLAIN_FIELDS):
+            return None
+        if field.is_relation:
+            if isinstance(value, field.related_model):
+                value = getattr(value, field.target_field.attname)
+            value = field.target_field.to_python(value)
+        else:
+            value = field.to_python(value)
+        try:
+            hash(value)
+        except TypeError:
+            # E.g. a list of an ArrayField.
+            return None
+        plain[field.attname] = value
+    return plain
+
+
+def _find_missing_criteria(model_class, criteria_list, chunk_size):
+    """
+    Returns criteria from ``criteria_list`` not matched by any instance,
+    issuing one query per ``chunk_size`` criteria that can be matched in
+    Python, and one query per criteria that can't.
+    """
+    manager = model_class._default_manager
+    missing = []
+    plain_criteria = []
+    for criteria in criteria_list:
+        plain = _get_plain_criteria(model_class, criteria)
+        if plain is None:
+            if not manager.filter(**criteria).exists():
+                missing.append(criteria)
+        else:
+            plain_criteria.append((criteria, plain))
+
+    for start in range(0, len(plain_criteria), chunk_size):
+        chunk = plain_criteria[start : start + chunk_size]
+        attnames = sorted({attname for _, plain in chunk for attname in plain})
+        query = reduce(operator.or_, (Q(**plain) for _, plain in chunk))
+        rows = manager.filter(query).values_list(*attnames)
+
+        found = defaultdict(set)
+        groups = {tuple(sorted(plain)) for _, plain in chunk}
+        for row in rows:
+            values = dict(zip(attnames, row))
+            for group in groups:
+                found[group].add(tuple(values[attname] for attname in group))
+        for criteria, plain in chunk:
+            group = tuple(sorted(plain))
+            if tuple(plain[attname] for attname in group) not in found[group]:
+                missing.append(criteria)
+    return missing
+
+
+class _ChangesContext(object):
+    """
+    Context manager returned by assert_instances_changed.
+
+    Snapshots primary keys (and values of ``fields``) on enter and exposes
+    ``created``, ``updated`` and ``deleted`` sets of primary keys on exit.
+    """
+
+    def __init__(self, model_class, fields, chunk_size, expected):
+        self.model_class = model_class
+        self.fields = list(fields or [])
+        self.chunk_size = chunk_size
+        self.expected = expected
+        self.created = self.updated = self.deleted = None
+
+    def _snapshot(self):
+        rows = self.model_class._default_manager.values_list("pk", *self.fields)
+        if self.fields:
+            # Values themselves are kept, as they may be unhashable (e.g. of a
+            # JSONField) and hashes of different values may collide.
+            return {
+                row[0]: row[1:] for row in rows.iterator(chunk_size=self.chunk_size)
+            }
+        return dict.fromkeys(pk for (pk,) in rows.iterator(chunk_size=self.chunk_size))
+
+    def __enter__(self):
+        self.before = self._snapshot()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            return False
+        before, after = self.before, self._snapshot()
+        self.created = after.keys() - before.keys()
+        self.deleted = before.keys() - after.keys()
+        self.updated = {
+            pk for pk, values in after.items() if before.get(pk, values) != values
+        }
+        del self.before
+
+        for change, expected in self.expected:
+            if expected is None:
+                continue
+            pks = getattr(self, change)
+            if len(pks) != expected:
+                raise AssertionError(
+                    "{0} {1} instances were {2}, expected {3}. ({4})".format(
+                        len(pks),
+                        self.model_class.__name__,
+                        change,
+                        expected,
+                        ", ".join(str(pk) for pk in sorted(pks)[:10]) or "none",
+                    )
+                )
+
+
+_SQL_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SQL_IN_RE = re.compile(r"\bIN \((?:\?, )*\?\)", re.IGNORECASE)
+_SQL_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _normalize_sql(sql):
+    """
+    Replaces literals in ``sql`` with placeholders, so queries differing
+    only by parameters are grouped together.
+    """
+    sql = _SQL_STRING_RE.sub("?", sql)
+    sql = _SQL_NUMBER_RE.sub("?", sql)
+    sql = _SQL_IN_RE.sub("IN (...)", sql)
+    return _SQL_WHITESPACE_RE.sub(" ", sql).strip()
+
+
+class _QueriesContext(CaptureQueriesContext):
+    """
+    Context manager returned by assert_max_queries/assert_no_duplicate_queries.
+    """
+
+    def __init__(self, exit_assertion, using):
+        super(_QueriesContext, self).__init__(connections[using])
+        self.exit_assertion = exit_assertion
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super(_QueriesContext, self).__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.exit_assertion(self)
+
+    def patterns(self):
+        """
+        Returns ``(normalized sql, count, total time)`` tuples, the most
+        frequent first.
+        """
+        patterns = OrderedDict()
+        for query in self.captured_queries:
+            pattern = _normalize_sql(query["sql"])
+            count, total_time = patterns.get(pattern, (0, 0.0))
+            patterns[pattern] = (count + 1, total_time + float(query["time"] or 0))
+        return sorted(
+            ((sql, count, total_time) for sql, (count, total_time) in patterns.items()),
+            key=lambda pattern: -pattern[1],
+        )
+
+    def report(self):
+        return "\n".join(
+            "{0}x ({1:.3f}s) {2}".format(count, total_time, sql)
+            for sql, count, total_time in self.patterns()
+        )
+
+
 class InstanceAssertionsMixin(object):
     """
     ORM-related assertions for testing instance creation and deletion.
@@ -216,11 +803,257 @@ class InstanceAssertionsMixin(object):
             **kwargs,
         )
 
+    def assert_instances_exist(self, model_class, criteria_list, chunk_size=100):
+        """
+        Checks if an instance exists for each of the criteria dicts in
+        ``criteria_list``. Criteria using only exact lookups on concrete
+        fields are resolved with a single query per ``chunk_size`` of them.
+
+        For example::
+
+        >>> self.assert_instances_exist(Article, [{'slug': 'a'}, {'slug': 'b'}])
+        """
+        criteria_list = list(criteria_list)
+        missing = _find_missing_criteria(model_class, criteria_list, chunk_size)
+        if missing:
+            raise AssertionError(
+                "No {0} found matching {1} of {2} criteria: {3}".format(
+                    model_class.__name__,
+                    len(missing),
+                    len(criteria_list),
+                    ", ".join(str(criteria) for criteria in missing),
+                )
+            )
+
+    def assert_instances_do_not_exist(self, model_class, criteria_list, chunk_size=100):
+        criteria_list = list(criteria_list)
+        missing = _find_missing_criteria(model_class, criteria_list, chunk_size)
+        missing_ids = {id(criteria) for criteria in missing}
+        found = [
+            criteria for criteria in criteria_list if id(criteria) not in missing_ids
+        ]
+        if found:
+            raise AssertionError(
+                "{0} found matching {1} of {2} criteria: {3}".format(
+                    model_class.__name__,
+                    len(found),
+                    len(criteria_list),
+                    ", ".join(str(criteria) for criteria in found),
+                )
+            )
+
+    def assert_instances_created(self, model_class, criteria_list, chunk_size=100):
+        """
+        Batched version of assert_instance_created.
+
+        For example::
+
+        >>> with self.assert_instances_created(Article, [{'slug': 'a'}]):
+        ...     Article.objects.create(slug='a')
+        """
+        return _InstanceContext(
+            self.assert_instances_do_not_exist,
+            self.assert_instances_exist,
+            model_class,
+            list(criteria_list),
+            chunk_size,
+        )
+
+    def assert_instances_deleted(self, model_class, criteria_list, chunk_size=100):
+        """
+        Batched version of assert_instance_deleted.
+        """
+        return _InstanceContext(
+            self.assert_instances_exist,
+            self.assert_instances_do_not_exist,
+            model_class,
+            list(criteria_list),
+            chunk_size,
+        )
+
+    def assert_instances_changed(
+        self,
+        model_class,
+        created=None,
+        updated=None,
+        deleted=None,
+        fields=None,
+        chunk_size=2000,
+    ):
+        """
+        Checks how many instances were created, updated or deleted by the code
+        inside the ``with`` statement. Rows are streamed in ``chunk_size``
+        batches and only primary keys and a hash of ``fields`` are kept, so
+        it stays cheap on large tables. Updates are detected on ``fields``
+        only.
+
+        For example::
+
+        >>> with self.assert_instances_changed(
+        ...     Article, created=2, updated=1, fields=['title']
+        ... ) as changes:
+        ...     self.view(request)
+        >>> changes.created
+        {11, 12}
+        """
+        expected = [("created", created), ("updated", updated), ("deleted", deleted)]
+        return _ChangesContext(model_class, fields, chunk_size, expected)
+
+    def assert_max_queries(self, count, using=DEFAULT_DB_ALIAS):
+        """
+        Checks if the code inside the ``with`` statement ran at most ``count``
+        database queries. Unlike ``assertNumQueries`` it reports the queries
+        grouped by pattern on failure.
+
+        For example::
+
+        >>> with self.assert_max_queries(3):
+        ...     self.view(request)
+        """
+
+        def check(context):
+            if len(context) > count:
+                raise AssertionError(
+                    "{0} queries executed, expected at most {1}:\n{2}".format(
+                        len(context),
+                        count,
+                        context.report(),
+                    )
+                )
+
+        return _QueriesContext(check, using)
+
+    def assert_no_duplicate_queries(self, max_repeats=1, using=DEFAULT_DB_ALIAS):
+        """
+        Checks if no query (ignoring its parameters) was executed more than
+        ``max_repeats`` times inside the ``with`` statement, which is how
+        N+1 problems usually show up.
+
+        For example::
+
+        >>> with self.assert_no_duplicate_queries():
+        ...     self.view(request)
+        """
+
+        def check(context):
+            duplicates = [
+                "{0}x {1}".format(count, sql)
+                for sql, count, _ in context.patterns()
+                if count > max_repeats
+            ]
+            if duplicates:
+                raise AssertionError(
+                    "Queries executed more than {0} time(s):\n{1}".format(
+                        max_repeats,
+                        "\n".join(duplicates),
+                    )
+                )
+
+        return _QueriesContext(check, using)
+
+
+class _DurationContext(object):
+    """
+    Context manager returned by assert_max_duration.
+    """
+
+    def __init__(self, max_ms):
+        self.max_ms = max_ms
+        self.duration = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is None and self.duration * 1000 > self.max_ms:
+            raise AssertionError(
+                "Block took {0:.2f}ms, expected at most {1}ms.".format(
+                    self.duration * 1000,
+                    self.max_ms,
+                )
+            )
+
+
+class PerformanceAssertionsMixin(object):
+    """
+    Latency assertions for code blocks and views.
+    """
+
+    def assert_max_duration(self, max_ms):
+        """
+        Checks if the code inside the ``with`` statement ran within the given
+        number of milliseconds.
+
+        For example::
+
+        >>> with self.assert_max_duration(50):
+        ...     self.view(request)
+        """
+        return _DurationContext(max_ms)
+
+    def assert_view_latency(
+        self,
+        request,
+        *args,
+        max_ms=None,
+        median_ms=None,
+        p95_ms=None,
+        runs=20,
+        warmup=3,
+        **kwargs,
+    ):
+        """
+        Calls ``self.view`` ``warmup`` times, then measures ``runs`` more calls
+        and checks the latency budgets given in milliseconds. ``request`` may
+        be a callable returning a new request for each call, which is needed
+        for requests that can't be reused (e.g. with a consumed body).
+
+        For example::
+
+        >>> self.assert_view_latency(self.factory.get(), p95_ms=20, runs=50)
+        """
+        get_request = request if callable(request) else lambda: request
+        for _ in range(warmup):
+            self.view(get_request(), *args, **kwargs)
+        durations = []
+        for _ in range(runs):
+            current_request = get_request()
+            start = time.perf_counter()
+            self.view(current_request, *args, **kwargs)
+            durations.append(time.perf_counter() - start)
+        timings = timing.Timings(durations)
+
+        budgets = [("max", max_ms, 100), ("median", median_ms, 50), ("p95", p95_ms, 95)]
+        for name, budget_ms, percent in budgets:
+            if budget_ms is None:
+                continue
+            latency_ms = timings.percentile(percent) * 1000
+            if latency_ms > budget_ms:
+                raise AssertionError(
+                    "View {0} latency is {1:.2f}ms, expected at most {2}ms "
+                    "(min={3:.2f}ms, median={4:.2f}ms, p95={5:.2f}ms, "
+                    "max={6:.2f}ms over {7} runs).".format(
+                        name,
+                        latency_ms,
+                        budget_ms,
+                        timings.min * 1000,
+                        timings.median * 1000,
+                        timings.percentile(95) * 1000,
+                        timings.max * 1000,
+                        runs,
+                    )
+                )
+        return timings
+
 
 class CompleteAssertionsMixin(
     StatusCodeAssertionsMixin,
     EmailAssertionsMixin,
     MessagesAssertionsMixin,
+    ContextAssertionsMixin,
     InstanceAssertionsMixin,
+    PerformanceAssertionsMixin,
 ):
     pass
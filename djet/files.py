@@ -1,67 +1,553 @@
-import datetime
+import functools
+import hashlib
+import io
 import os
+import posixpath
+import sqlite3
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict, namedtuple
 from io import BytesIO
 
+from django.core.files import File
 from django.core.files.storage import Storage, default_storage
-from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.core.files.uploadedfile import InMemoryUploadedFile, UploadedFile
+from django.utils import timezone
+from django.utils.encoding import force_bytes
 
 
-class InMemoryStorage(Storage):
+def _split_path(path):
+    return [part for part in path.split("/") if part]
+
+
+class _Directory(object):
+    """
+    Node of the directory tree indexing InMemoryStorage names.
+    """
+
     def __init__(self):
+        self.directories = {}
         self.files = {}
 
+    def find(self, parts, create=False):
+        directory = self
+        for part in parts:
+            if part not in directory.directories:
+                if not create:
+                    return None
+                directory.directories[part] = _Directory()
+            directory = directory.directories[part]
+        return directory
+
+    def add(self, name):
+        parts = _split_path(name)
+        self.find(parts[:-1], create=True).files[parts[-1]] = None
+
+    def remove(self, name):
+        parts = _split_path(name)
+        path = [self]
+        for part in parts[:-1]:
+            path.append(path[-1].directories[part])
+        del path[-1].files[parts[-1]]
+        for parent, part in zip(reversed(path[:-1]), reversed(parts[:-1])):
+            directory = parent.directories[part]
+            if directory.directories or directory.files:
+                break
+            del parent.directories[part]
+
+
+class _SpillFile(object):
+    """
+    Anonymous temporary file shared by the content InMemoryStorage spills,
+    so that spilled files hold a single file descriptor between them. It is
+    dropped, freeing its disk space, once none of its content is left.
+    """
+
+    def __init__(self):
+        self._stream = None
+        self._lock = threading.Lock()
+        self._contents = 0
+
+    def write(self, chunks):
+        """
+        Appends ``chunks`` and returns them as ``_SpilledContent``, or
+        ``b""`` when they are empty.
+        """
+        with self._lock:
+            if self._stream is None:
+                self._stream = tempfile.TemporaryFile()
+            stream = self._stream
+            offset = stream.seek(0, io.SEEK_END)
+            for chunk in chunks:
+                stream.write(force_bytes(chunk))
+            size = stream.tell() - offset
+            stream.flush()
+            if not size:
+                if not self._contents:
+                    self._stream = None
+                return b""
+            self._contents += 1
+        return _SpilledContent(self, stream, offset, size)
+
+    def read(self, stream, offset, size):
+        if hasattr(os, "pread"):
+            return os.pread(stream.fileno(), size, offset)
+        with self._lock:
+            stream.seek(offset)
+            return stream.read(size)
+
+    def release(self):
+        with self._lock:
+            self._contents -= 1
+            if not self._contents:
+                # Files still open keep the stream, it is closed when collected.
+                self._stream = None
+
+
+class _SpilledContent(object):
+    """
+    Content spilled to a ``_SpillFile``: its offset and size in there.
+    """
+
+    def __init__(self, spill_file, stream, offset, size):
+        self.spill_file = spill_file
+        self.stream = stream
+        self.offset = offset
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def read(self, position, size):
+        size = max(min(size, self.size - position), 0)
+        if not size:
+            return b""
+        return self.spill_file.read(self.stream, self.offset + position, size)
+
+    def release(self):
+        self.spill_file.release()
+
+
+class _SpilledReader(io.RawIOBase):
+    """
+    Read-only stream over spilled content, with a position of its own.
+    """
+
+    def __init__(self, content):
+        self._content = content
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._content)
+        self._position = max(offset, 0)
+        return self._position
+
+    def readinto(self, b):
+        data = self._content.read(self._position, len(b))
+        b[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def close(self):
+        self._content = None
+        super(_SpilledReader, self).close()
+
+
+class _Blob(object):
+    """
+    Immutable content saved in InMemoryStorage: bytes, or ``_SpilledContent``
+    once spilled. Shared by files with the same content when deduplicating.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.size = len(buffer)
+        self.references = 0
+
+    @property
+    def spilled(self):
+        return isinstance(self.buffer, _SpilledContent)
+
+    def spill(self, spill_file):
+        self.buffer = spill_file.write([self.buffer])
+
+    def open(self, name):
+        if self.spilled:
+            return File(_SpilledReader(self.buffer), name)
+        return File(BytesIO(self.buffer), name)
+
+    def release(self):
+        if self.spilled:
+            self.buffer.release()
+
+
+class _StoredFile(object):
+    """
+    File saved in InMemoryStorage: its content and metadata.
+    """
+
+    def __init__(self, blob, content_hash, created_time=None):
+        self.blob = blob
+        self.content_hash = content_hash
+        self.modified_time = self.accessed_time = timezone.now()
+        self.created_time = created_time or self.modified_time
+
+
+StorageStats = namedtuple(
+    "StorageStats", ["files", "logical_size", "unique_size", "dedup_ratio"]
+)
+
+
+class InMemoryStorage(Storage):
+    """
+    Keeps saved files in memory.
+
+    Files bigger than ``spool_threshold`` bytes are spilled to an anonymous
+    temporary file instead. When files kept in memory exceed
+    ``max_memory_size`` bytes in total, the least recently used ones are
+    spilled as well.
+
+    With ``deduplicate``, files with the same content share a single copy of
+    it, released when the last of them is deleted.
+    """
+
+    def __init__(self, spool_threshold=None, max_memory_size=None, deduplicate=False):
+        self.spool_threshold = spool_threshold
+        self.max_memory_size = max_memory_size
+        self.deduplicate = deduplicate
+        self.files = {}
+        self.memory_size = 0
+        self.logical_size = 0
+        self.unique_size = 0
+        self._blobs = {}
+        self._in_memory = OrderedDict()
+        self._spill_file = _SpillFile()
+        self._tree = _Directory()
+        self._name_counters = {}
+
     def _open(self, name, mode):
-        return self.files[name]
+        stored_file = self.files[name]
+        if stored_file.blob in self._in_memory:
+            self._in_memory.move_to_end(stored_file.blob)
+        stored_file.accessed_time = timezone.now()
+        return stored_file.blob.open(name)
 
     def _save(self, name, content):
-        self.files[name] = content
+        created_time = None
+        if name in self.files:
+            created_time = self.files[name].created_time
+            self.delete(name)
+        content_hash = hashlib.sha256()
+
+        def chunks():
+            for chunk in content.chunks():
+                chunk = force_bytes(chunk)
+                content_hash.update(chunk)
+                yield chunk
+
+        if self.spool_threshold is not None and content.size > self.spool_threshold:
+            blob = _Blob(self._spill_file.write(chunks()))
+        else:
+            blob = _Blob(b"".join(chunks()))
+        content_hash = content_hash.hexdigest()
+        if self.deduplicate and content_hash in self._blobs:
+            blob.release()
+            blob = self._blobs[content_hash]
+        else:
+            self._add_blob(blob, content_hash)
+        blob.references += 1
+        self.logical_size += blob.size
+        self.files[name] = _StoredFile(blob, content_hash, created_time)
+        self._tree.add(name)
         return name
 
+    def _add_blob(self, blob, content_hash):
+        if self.deduplicate:
+            self._blobs[content_hash] = blob
+        self.unique_size += blob.size
+        if not blob.spilled:
+            self._in_memory[blob] = blob.size
+            self.memory_size += blob.size
+            self._enforce_memory_budget()
+
+    def _enforce_memory_budget(self):
+        if self.max_memory_size is None:
+            return
+        while self._in_memory and self.memory_size > self.max_memory_size:
+            blob, size = self._in_memory.popitem(last=False)
+            self.memory_size -= size
+            blob.spill(self._spill_file)
+
+    def is_spilled(self, name):
+        return self.files[name].blob.spilled
+
     def delete(self, name):
-        del self.files[name]
+        stored_file = self.files.pop(name)
+        self._tree.remove(name)
+        blob = stored_file.blob
+        blob.references -= 1
+        self.logical_size -= blob.size
+        if blob.references:
+            return
+        self._blobs.pop(stored_file.content_hash, None)
+        self.unique_size -= blob.size
+        if blob in self._in_memory:
+            self.memory_size -= self._in_memory.pop(blob)
+        blob.release()
 
     def exists(self, name):
-        return name in self.files
+        return name in self.files or self._tree.find(_split_path(name)) is not None
+
+    def get_available_name(self, name, max_length=None):
+        """
+        Numbers taken names with a counter kept per name (``file_1.txt``,
+        ``file_2.txt``...) instead of probing random suffixes. Falls back to
+        Django's truncating allocator when a numbered name is too long.
+        """
+        name = str(name).replace("\\", "/")
+        get_available_name = super(InMemoryStorage, self).get_available_name
+        if not self.exists(name):
+            return get_available_name(name, max_length=max_length)
+        dir_name, file_name = posixpath.split(name)
+        file_root, file_ext = posixpath.splitext(file_name)
+        while True:
+            counter = self._name_counters.get(name, 0) + 1
+            self._name_counters[name] = counter
+            candidate = posixpath.join(
+                dir_name, "{0}_{1}{2}".format(file_root, counter, file_ext)
+            )
+            if max_length and len(candidate) > max_length:
+                return get_available_name(name, max_length=max_length)
+            if not self.exists(candidate):
+                return get_available_name(candidate, max_length=max_length)
 
     def listdir(self, path):
-        directories, files = set(), []
-        for name in self.files:
-            if name.startswith(path):
-                without_path = name[len(path) :]
-                try:
-                    slash_index = without_path.index("/")
-                    directories.add(without_path[:slash_index])
-                except ValueError:
-                    files.append(without_path)
-        return list(directories), files
+        directory = self._tree.find(_split_path(path))
+        if directory is None:
+            return [], []
+        return list(directory.directories), list(directory.files)
+
+    def walk(self, path=""):
+        """
+        Like ``os.walk`` - yields ``(dirpath, dirnames, filenames)`` for
+        ``path`` and each directory below it, top-down.
+        """
+        directory = self._tree.find(_split_path(path))
+        if directory is None:
+            return
+        pending = [(path, directory)]
+        while pending:
+            dirpath, directory = pending.pop()
+            yield dirpath, list(directory.directories), list(directory.files)
+            pending.extend(
+                (posixpath.join(dirpath, name), subdirectory)
+                for name, subdirectory in reversed(list(directory.directories.items()))
+            )
 
     def size(self, name):
-        file_instance = self.files[name]
-        file_instance.seek(0, 2)
-        return file_instance.tell()
+        return self.files[name].blob.size
+
+    def stats(self):
+        """
+        Returns ``StorageStats`` with the number of files, their total size,
+        the size of their unique content and the ratio of both.
+        """
+        dedup_ratio = self.logical_size / self.unique_size if self.unique_size else 1.0
+        return StorageStats(
+            len(self.files), self.logical_size, self.unique_size, dedup_ratio
+        )
 
     def url(self, name):
         return name
 
-    def accessed_time(self, name):
-        return datetime.datetime.now()
+    def content_hash(self, name):
+        """
+        Returns the SHA-256 hex digest of the file content.
+        """
+        return self.files[name].content_hash
+
+    def get_accessed_time(self, name):
+        return self.files[name].accessed_time
+
+    def get_created_time(self, name):
+        return self.files[name].created_time
 
-    def created_time(self, name):
-        return datetime.datetime.now()
+    def get_modified_time(self, name):
+        return self.files[name].modified_time
 
-    def modified_time(self, name):
-        return datetime.datetime.now()
+    accessed_time = get_accessed_time
+    created_time = get_created_time
+    modified_time = get_modified_time
 
     def clear(self):
-        self.files = {}
+        for name in list(self.files):
+            self.delete(name)
+        self._tree = _Directory()
+        self._name_counters = {}
+
+
+def _locked(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class ThreadSafeInMemoryStorage(InMemoryStorage):
+    """
+    InMemoryStorage guarded by a lock, for files saved and read from
+    different threads, e.g. the live server thread of
+    ``ViewLiveServerTestCase`` and the test itself.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._lock = threading.RLock()
+        super(ThreadSafeInMemoryStorage, self).__init__(*args, **kwargs)
+
+    save = _locked(InMemoryStorage.save)
+    _open = _locked(InMemoryStorage._open)
+    _save = _locked(InMemoryStorage._save)
+    delete = _locked(InMemoryStorage.delete)
+    exists = _locked(InMemoryStorage.exists)
+    get_available_name = _locked(InMemoryStorage.get_available_name)
+    listdir = _locked(InMemoryStorage.listdir)
+    size = _locked(InMemoryStorage.size)
+    is_spilled = _locked(InMemoryStorage.is_spilled)
+    stats = _locked(InMemoryStorage.stats)
+    clear = _locked(InMemoryStorage.clear)
+
+    def walk(self, path=""):
+        with self._lock:
+            return iter(list(super(ThreadSafeInMemoryStorage, self).walk(path)))
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class SQLiteStorage(Storage):
+    """
+    Keeps saved files in a local SQLite database, so they are visible to
+    every thread and process opening the same ``location``, without
+    touching ``MEDIA_ROOT``. By default a temporary database is created and
+    removed when the storage is garbage collected.
+    """
+
+    def __init__(self, location=None):
+        if location is None:
+            fd, location = tempfile.mkstemp(prefix="djet-", suffix=".sqlite3")
+            os.close(fd)
+            weakref.finalize(self, _remove_file, location)
+        self.location = location
+        self._local = threading.local()
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS files "
+            "(name TEXT PRIMARY KEY, content BLOB NOT NULL, size INTEGER NOT NULL)"
+        )
+
+    @property
+    def _connection(self):
+        # Connections can't be shared between threads, nor inherited by
+        # forked processes.
+        if getattr(self._local, "pid", None) != os.getpid():
+            self._local.connection = sqlite3.connect(self.location, timeout=30)
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def _execute(self, sql, params=()):
+        with self._connection as connection:
+            return connection.execute(sql, params).fetchall()
+
+    def _get(self, column, name):
+        rows = self._execute(
+            "SELECT {0} FROM files WHERE name = ?".format(column), (name,)
+        )
+        if not rows:
+            raise FileNotFoundError(name)
+        return rows[0][0]
+
+    def _open(self, name, mode):
+        return File(BytesIO(self._get("content", name)), name)
+
+    def _save(self, name, content):
+        data = b"".join(force_bytes(chunk) for chunk in content.chunks())
+        self._execute(
+            "INSERT OR REPLACE INTO files (name, content, size) VALUES (?, ?, ?)",
+            (name, data, len(data)),
+        )
+        return name
+
+    def delete(self, name):
+        self._execute("DELETE FROM files WHERE name = ?", (name,))
+
+    def _names_in(self, path):
+        prefix = "/".join(_split_path(path))
+        if prefix:
+            prefix += "/"
+        rows = self._execute(
+            "SELECT name FROM files WHERE substr(name, 1, ?) = ?",
+            (len(prefix), prefix),
+        )
+        return [name[len(prefix) :] for (name,) in rows]
+
+    def exists(self, name):
+        if self._execute("SELECT 1 FROM files WHERE name = ?", (name,)):
+            return True
+        return bool(_split_path(name)) and bool(self._names_in(name))
+
+    def listdir(self, path):
+        directories, files = {}, {}
+        for name in self._names_in(path):
+            parts = _split_path(name)
+            if len(parts) > 1:
+                directories[parts[0]] = None
+            else:
+                files[parts[0]] = None
+        return list(directories), list(files)
+
+    def size(self, name):
+        return self._get("size", name)
+
+    def url(self, name):
+        return name
+
+    def clear(self):
+        self._execute("DELETE FROM files")
+
+    def close(self):
+        if getattr(self._local, "pid", None) == os.getpid():
+            self._local.connection.close()
+            del self._local.pid
 
 
 class InMemoryStorageMixin(object):
     storage = InMemoryStorage
+    storage_kwargs = None
+
+    def get_storage_kwargs(self):
+        return self.storage_kwargs or {}
 
     def _pre_setup(self):
         self._wrapped_storage = default_storage._wrapped
-        default_storage._wrapped = self.storage()
+        default_storage._wrapped = self.storage(**self.get_storage_kwargs())
         super(InMemoryStorageMixin, self)._pre_setup()
 
     def _post_teardown(self):
@@ -74,32 +560,128 @@ class InMemoryStorageMixin(object):
 
 
 def create_inmemory_file(file_name="tmp.txt", content=b"", content_type=None):
-    stream = BytesIO()
-    stream.write(content)
-    file = InMemoryUploadedFile(
-        stream, None, file_name, content_type, stream.tell(), None
+    return InMemoryUploadedFile(
+        BytesIO(content), None, file_name, content_type, len(content), None
+    )
+
+
+class _PatternReader(io.RawIOBase):
+    """
+    Read-only stream of ``size`` bytes repeating ``pattern``, generated as
+    they're read.
+    """
+
+    block_size = 64 * 1024
+
+    def __init__(self, size, pattern):
+        self._size = size
+        self._pattern_size = len(pattern)
+        self._block = pattern * (self.block_size // len(pattern) + 2)
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._position = max(offset, 0)
+        return self._position
+
+    def readinto(self, b):
+        count = max(min(len(b), self._size - self._position), 0)
+        view = memoryview(b).cast("B")
+        offset = self._position % self._pattern_size
+        written = 0
+        while written < count:
+            length = min(count - written, len(self._block) - offset)
+            view[written : written + length] = self._block[offset : offset + length]
+            written += length
+            offset = (offset + length) % self._pattern_size
+        self._position += count
+        return count
+
+
+def create_generated_file(
+    file_name="tmp.bin", size=0, pattern=b"djet", content_type=None, chunk_size=None
+):
+    """
+    Creates a file of ``size`` bytes repeating ``pattern``. The content is
+    generated while it's read, so files of any size don't take memory unless
+    read at once - ``chunks()`` yields ``chunk_size`` bytes at a time.
+
+    Saving it in ``InMemoryStorage`` keeps it in memory unless the storage
+    has a lower ``spool_threshold``, and multipart requests read it whole.
+    """
+    if not pattern:
+        raise ValueError("Pattern of a generated file cannot be empty.")
+    file = UploadedFile(
+        _PatternReader(size, force_bytes(pattern)), file_name, content_type, size
     )
-    file.seek(0)
+    if chunk_size:
+        file.DEFAULT_CHUNK_SIZE = chunk_size
     return file
 
 
+def create_inmemory_files(count, file_name="tmp{0}.txt", factory=None, **kwargs):
+    """
+    Creates ``count`` files named ``file_name`` formatted with their index,
+    passing ``kwargs`` to ``factory`` (``create_inmemory_file`` by default).
+
+    For example::
+
+        >>> files = create_inmemory_files(3, 'upload{0}.bin',
+        ...     factory=create_generated_file, size=10 * 1024 * 1024)
+        >>> [file.name for file in files]
+        ['upload0.bin', 'upload1.bin', 'upload2.bin']
+    """
+    factory = factory or create_inmemory_file
+    return [factory(file_name.format(index), **kwargs) for index in range(count)]
+
+
+@functools.lru_cache(maxsize=32)
+def _encode_image(format, width, height, color, mode):
+    from PIL import Image
+
+    stream = BytesIO()
+    Image.new(mode, (width, height), color).save(stream, format=format)
+    return stream.getvalue()
+
+
 def create_inmemory_image(
-    file_name="tmp.png", format=None, width=200, height=200, content_type=None
+    file_name="tmp.png",
+    format=None,
+    width=200,
+    height=200,
+    content_type=None,
+    color=(255, 0, 0, 0),
+    mode="RGBA",
 ):
+    """
+    Images are encoded once per distinct ``format``, size, ``color`` and
+    ``mode`` - every call returns a new file over the same encoded bytes.
+    """
     from PIL import Image
 
     if not format:
         _, extension = os.path.splitext(file_name)
-        format = extension[1:].upper()
+        # E.g. ".jpg" is saved in the "JPEG" format.
+        format = Image.registered_extensions().get(
+            extension.lower(), extension[1:].upper()
+        )
     if not content_type:
-        content_type = "image/{0}".format(format)
-    stream = BytesIO()
-    size = (width, height)
-    color = (255, 0, 0, 0)
-    image = Image.new("RGBA", size, color)
-    image.save(stream, format=format)
-    image_file = InMemoryUploadedFile(
-        stream, None, file_name, content_type, stream.tell(), None
+        content_type = Image.MIME.get(format, "image/{0}".format(format))
+    if isinstance(color, list):
+        color = tuple(color)
+    content = _encode_image(format, width, height, color, mode)
+    return InMemoryUploadedFile(
+        BytesIO(content), None, file_name, content_type, len(content), None
     )
-    image_file.seek(0)
-    return image_file
@@ -0,0 +1,34 @@
+from collections import namedtuple
+
+from django.contrib.messages.storage.base import BaseStorage
+
+RecordedMessage = namedtuple("RecordedMessage", ["level", "message", "tags"])
+
+
+class InMemoryMessageStorage(BaseStorage):
+    """
+    Message storage kept only in memory, for requests built without
+    ``MessageMiddleware`` (or set as ``MESSAGE_STORAGE`` in tests). Messages
+    are never serialized - each added one is also recorded in ``records``
+    as a ``RecordedMessage`` tuple, which reading messages doesn't consume.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        super(InMemoryMessageStorage, self).__init__(request, *args, **kwargs)
+        self._stored = []
+        self.records = []
+
+    def add(self, level, message, extra_tags=""):
+        queued = len(self._queued_messages)
+        super(InMemoryMessageStorage, self).add(level, message, extra_tags)
+        for added in self._queued_messages[queued:]:
+            self.records.append(
+                RecordedMessage(added.level, str(added.message), added.tags)
+            )
+
+    def _get(self, *args, **kwargs):
+        return self._stored, True
+
+    def _store(self, messages, response, *args, **kwargs):
+        self._stored = list(messages)
+        return []
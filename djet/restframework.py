@@ -4,13 +4,45 @@ from djet import testcases
 
 
 class APIRequestFactory(testcases.RequestFactory, test.APIRequestFactory):
-    def _request(self, method, **kwargs):
+    def _request(self, method, token=None, **kwargs):
         request = super(APIRequestFactory, self)._request(method, **kwargs)
         user = kwargs.get("user")
-        token = kwargs.get("token")
         test.force_authenticate(request, user, token)
         return request
 
+    def template(
+        self,
+        method,
+        path="",
+        user=None,
+        session=None,
+        messages=False,
+        token=None,
+        **defaults,
+    ):
+        prototype = self._request(method, path=path, **defaults)
+        return APIRequestTemplate(self, prototype, user, session, messages, token)
+
+
+class APIRequestTemplate(testcases.RequestTemplate):
+    """
+    ``RequestTemplate`` forcing authentication of its requests with the
+    template ``user`` and ``token``.
+    """
+
+    def __init__(
+        self, factory, prototype, user=None, session=None, messages=False, token=None
+    ):
+        super(APIRequestTemplate, self).__init__(
+            factory, prototype, user, session, messages
+        )
+        self.token = token
+
+    def __call__(self, query=None, user=None, **extra):
+        request = super(APIRequestTemplate, self).__call__(query, user, **extra)
+        test.force_authenticate(request, request.user, self.token)
+        return request
+
 
 class APIViewTransactionTestCase(testcases.ViewTransactionTestCase):
     factory_class = APIRequestFactory
@@ -23,7 +55,9 @@ class APIViewTestCase(testcases.ViewTestCase):
     def _get_view(self, request):
         if self.viewset:
             actions = request.META.pop("actions")
-            return self.viewset.as_view(actions=actions, **self.get_view_kwargs())
+            return self._as_view(
+                self.viewset, actions=actions, **self.get_view_kwargs()
+            )
         return super(APIViewTestCase, self)._get_view(request)
 
 
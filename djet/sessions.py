@@ -0,0 +1,32 @@
+from django.contrib.sessions.backends.base import SessionBase
+
+
+class SessionStore(SessionBase):
+    """
+    Session kept only in memory, for requests built without
+    ``SessionMiddleware``. Nothing is ever read from nor written to a
+    session backend.
+    """
+
+    def __init__(self, data=None, session_key=None):
+        super(SessionStore, self).__init__(session_key=session_key)
+        self._session_cache = dict(data or {})
+
+    def exists(self, session_key):
+        return False
+
+    def create(self):
+        self._session_key = self._get_new_session_key()
+        self.modified = True
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            self.create()
+
+    def delete(self, session_key=None):
+        if session_key is None or session_key == self.session_key:
+            self._session_cache = {}
+            self._session_key = None
+
+    def load(self):
+        return {}
@@ -1,6 +1,27 @@
+import asyncio
+import cProfile
+import io
+import pstats
+import queue
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
+from urllib.parse import parse_qs, urlencode
 
 from django import test as django_test
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.template.response import SimpleTemplateResponse
+from django.test.client import FakePayload
+
+from djet import sessions, timing
+from djet.messages import InMemoryMessageStorage
+
+try:
+    from django.test import AsyncRequestFactory as DjangoAsyncRequestFactory
+except ImportError:  # Django < 3.1
+    DjangoAsyncRequestFactory = None
 
 
 class RequestFactory(django_test.RequestFactory):
@@ -14,12 +35,136 @@ class RequestFactory(django_test.RequestFactory):
             shortcut = partial(self._request, method)
             setattr(self, method, shortcut)
 
-    def _request(self, method, user=None, path="", **kwargs):
+    def _request(
+        self, method, user=None, path="", session=None, messages=False, **kwargs
+    ):
         super_method = getattr(super(RequestFactory, self), method.lower())
         request = super_method(path=path, **kwargs)
+        return self._attach(request, user, session, messages)
+
+    def _attach(self, request, user, session=None, messages=False):
+        """
+        Sets ``user`` and, instead of running session and message
+        middleware, an in-memory session with ``session`` data and an
+        in-memory message storage.
+        """
         request.user = user
+        if session is not None:
+            request.session = sessions.SessionStore(session)
+        if messages:
+            request._messages = InMemoryMessageStorage(request)
         return request
 
+    def template(
+        self, method, path="", user=None, session=None, messages=False, **defaults
+    ):
+        """
+        Builds a request once and returns a ``RequestTemplate`` creating
+        copies of it, which is much cheaper than building every request from
+        scratch.
+
+        For example::
+
+        >>> template = self.factory.template('get', data={'q': 'djet'})
+        >>> requests = [template(query={'page': n}) for n in range(500)]
+        """
+        prototype = self._request(method, path=path, **defaults)
+        return RequestTemplate(self, prototype, user, session, messages)
+
+    def _copy_request(self, prototype, body, query_string, extra):
+        environ = dict(prototype.environ, **extra)
+        environ["QUERY_STRING"] = query_string
+        environ["wsgi.input"] = FakePayload(body)
+        return WSGIRequest(environ)
+
+
+class RequestTemplate(object):
+    """
+    Creates requests from a request built by ``RequestFactory.template``,
+    reusing its encoded body and environ. ``query`` parameters are merged
+    into the query string and ``extra`` environ keys (e.g. headers) are
+    added to it.
+    """
+
+    def __init__(self, factory, prototype, user=None, session=None, messages=False):
+        self.factory = factory
+        self.prototype = prototype
+        self.user = user
+        self.session = session
+        self.messages = messages
+        self.body = prototype.body
+        self.query_string = prototype.META["QUERY_STRING"]
+        self._encoded_query = {
+            key: urlencode({key: values}, doseq=True)
+            for key, values in parse_qs(
+                self.query_string, keep_blank_values=True
+            ).items()
+        }
+
+    def __call__(self, query=None, user=None, **extra):
+        query_string = self.query_string
+        if query:
+            parts = [
+                encoded
+                for key, encoded in self._encoded_query.items()
+                if key not in query
+            ]
+            parts.append(urlencode(query, doseq=True))
+            query_string = "&".join(parts)
+        request = self.factory._copy_request(
+            self.prototype, self.body, query_string, extra
+        )
+        if user is None:
+            user = self.user
+        return self.factory._attach(request, user, self.session, self.messages)
+
+
+def _get_header_name(environ_key):
+    """
+    Returns the ASGI header name of a WSGI environ key, e.g.
+    ``b"x-requested-with"`` for ``HTTP_X_REQUESTED_WITH``, or ``None`` when
+    the key isn't a header.
+    """
+    if environ_key in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+        name = environ_key
+    elif environ_key.startswith("HTTP_"):
+        name = environ_key[len("HTTP_") :]
+    else:
+        return None
+    return name.lower().replace("_", "-").encode("ascii")
+
+
+if DjangoAsyncRequestFactory:
+
+    class AsyncRequestFactory(RequestFactory, DjangoAsyncRequestFactory):
+        """
+        Builds ``ASGIRequest`` objects for ``ViewTestCaseMixin.async_view``.
+        """
+
+        def _copy_request(self, prototype, body, query_string, extra):
+            scope = dict(prototype.scope, query_string=query_string)
+            headers, environ = {}, {}
+            for key, value in extra.items():
+                name = _get_header_name(key)
+                if name is None:
+                    environ[key] = value
+                else:
+                    headers[name] = value.encode("latin1")
+            if headers:
+                scope["headers"] = [
+                    (name, value)
+                    for name, value in scope["headers"]
+                    if name not in headers
+                ] + list(headers.items())
+            # A plain file, as given by Django's ASGI handler - the multipart
+            # parser reads past the end of the body, which FakePayload forbids.
+            request = prototype.__class__(scope, io.BytesIO(body))
+            request.META.update(environ)
+            return request
+
+else:
+    AsyncRequestFactory = None
+
 
 class MiddlewareType:
     PROCESS_REQUEST = "process_request"
@@ -29,18 +174,255 @@ class MiddlewareType:
     PROCESS_TEMPLATE_RESPONSE = "process_template_response"
 
 
+def _adapt_method_mode(is_async, method, method_is_async=None):
+    """
+    Mirrors ``BaseHandler.adapt_method_mode`` - wraps ``method`` with
+    ``sync_to_async`` or ``async_to_sync`` when its mode differs.
+    """
+    if method_is_async is None:
+        method_is_async = asyncio.iscoroutinefunction(method)
+    if is_async and not method_is_async:
+        from asgiref.sync import sync_to_async
+
+        return sync_to_async(method, thread_sensitive=True)
+    if not is_async and method_is_async:
+        from asgiref.sync import async_to_sync
+
+        return async_to_sync(method)
+    return method
+
+
+def _timed(method, label, is_async=None):
+    """
+    Wraps a middleware hook (or a middleware instance) so that its wall time
+    is added to the ``ViewTimings`` of the request being handled.
+    """
+    if is_async is None:
+        is_async = asyncio.iscoroutinefunction(method)
+
+    if is_async:
+
+        async def timed(request, *args):
+            start = time.perf_counter()
+            try:
+                return await method(request, *args)
+            finally:
+                request._djet_view_timings.add(label, time.perf_counter() - start)
+
+    else:
+
+        def timed(request, *args):
+            start = time.perf_counter()
+            try:
+                return method(request, *args)
+            finally:
+                request._djet_view_timings.add(label, time.perf_counter() - start)
+
+    return timed
+
+
+_PLAIN_TYPES = (str, bytes, int, float, complex, bool, type(None), type)
+
+
+def _freeze(value):
+    """
+    Returns a hashable key for plain values - scalars, classes and dicts,
+    lists and tuples of them. Raises ``TypeError`` for anything else, e.g.
+    model instances, which compare equal by pk even when their data differs.
+    """
+    # Types are part of the key, as e.g. ``1 == True == 1.0``.
+    if isinstance(value, dict):
+        items = frozenset((_freeze(key), _freeze(item)) for key, item in value.items())
+        return type(value), items
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(_freeze(item) for item in value)
+    if isinstance(value, _PLAIN_TYPES):
+        return type(value), value
+    raise TypeError("{0!r} is not a plain value.".format(value))
+
+
+class _ResponseMixin(object):
+    """
+    Base of the mixins added to response classes at runtime.
+    """
+
+    def __reduce_ex__(self, protocol):
+        # Classes built at runtime can't be found by pickle, so pickle (and
+        # copy) the response as its original class.
+        original_class = next(
+            cls for cls in type(self).__mro__ if not issubclass(cls, _ResponseMixin)
+        )
+        return _new_response, (original_class,), self.__getstate__()
+
+
+def _new_response(response_class):
+    return response_class.__new__(response_class)
+
+
+class _LazyRenderMixin(_ResponseMixin):
+    """
+    Renders a template response when its content is first needed.
+    """
+
+    @property
+    def content(self):
+        if not self.is_rendered:
+            self.render()
+        return super(_LazyRenderMixin, self).content
+
+    @content.setter
+    def content(self, value):
+        super(_LazyRenderMixin, type(self)).content.fset(self, value)
+
+    def __iter__(self):
+        if not self.is_rendered:
+            self.render()
+        return super(_LazyRenderMixin, self).__iter__()
+
+    def __reduce_ex__(self, protocol):
+        if not self.is_rendered:
+            self.render()
+        return super(_LazyRenderMixin, self).__reduce_ex__(protocol)
+
+
+class _ViewTimingsMixin(_ResponseMixin):
+    """
+    Leaves ``view_timings`` of a response out of its pickled state, e.g.
+    when cached.
+    """
+
+    def __getstate__(self):
+        getstate = getattr(super(_ViewTimingsMixin, self), "__getstate__", None)
+        state = dict(getstate() if getstate else self.__dict__)
+        state.pop("view_timings", None)
+        return state
+
+
+class _TimedRenderMixin(_ViewTimingsMixin):
+    """
+    Records the time spent rendering a response in its ``view_timings``.
+    """
+
+    def render(self):
+        return self.view_timings.measure(
+            "render", super(_TimedRenderMixin, self).render
+        )
+
+
+_response_classes = {}
+
+
+def _extend_response(response, mixin):
+    """
+    Adds ``mixin`` to the class of ``response``, at class level so that
+    nothing unpicklable is kept on the instance.
+    """
+    if not isinstance(response, mixin):
+        key = (mixin, response.__class__)
+        if key not in _response_classes:
+            _response_classes[key] = type(
+                response.__class__.__name__, (mixin, response.__class__), {}
+            )
+        response.__class__ = _response_classes[key]
+    return response
+
+
+def _render_lazily(response):
+    if isinstance(response, SimpleTemplateResponse) and not response.is_rendered:
+        _extend_response(response, _LazyRenderMixin)
+    return response
+
+
+def _cache_template_loaders():
+    """
+    Wraps loaders of Django template engines which don't cache compiled
+    templates yet in the cached loader. Returns what's needed to restore them.
+    """
+    from django.template import engines
+    from django.template.backends.django import DjangoTemplates
+    from django.template.loaders.cached import Loader as CachedLoader
+
+    replaced = []
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        engine = backend.engine
+        loaders = engine.template_loaders
+        if any(isinstance(loader, CachedLoader) for loader in loaders):
+            continue
+        engine.template_loaders = [CachedLoader(engine, engine.loaders)]
+        replaced.append((engine, loaders))
+    return replaced
+
+
+def _restore_template_loaders(replaced):
+    for engine, loaders in replaced:
+        engine.template_loaders = loaders
+
+
+class _CompiledMiddleware(object):
+    """
+    Middleware instances and their hooks, built once per test class.
+
+    Middleware receives ``get_response`` at instantiation time, so it is
+    bound to this object, which forwards to the test case currently
+    running a view.
+    """
+
+    def __init__(self, is_async=False, instrumented=False):
+        self.is_async = is_async
+        self.instrumented = instrumented
+        self.request_middleware = []
+        self.view_middleware = []
+        self.template_response_middleware = []
+        self.response_middleware = []
+        self.exception_middleware = []
+        self.middleware_chain = None
+        self.test_case = None
+
+    def get_response(self, request):
+        return self.test_case._get_response(request)
+
+    async def get_response_async(self, request):
+        return await self.test_case._get_response_async(request)
+
+
 class ViewTestCaseMixin(object):
     view_class = None
     view_function = None
     view_kwargs = None
     factory_class = RequestFactory
+    async_factory_class = AsyncRequestFactory
     middleware_classes = None
     middleware = None
+    record_view_timings = False
+    profile_view = False
+    view_timings = None
+    render_lazily = False
+    cache_templates = False
+
+    @classmethod
+    def setUpClass(cls):
+        super(ViewTestCaseMixin, cls).setUpClass()
+        cls._replaced_template_loaders = []
+        if cls.cache_templates:
+            cls._replaced_template_loaders = _cache_template_loaders()
+
+    @classmethod
+    def tearDownClass(cls):
+        _restore_template_loaders(cls._replaced_template_loaders)
+        # Compiled middleware keeps the last test alive and views cached for
+        # kwargs hashed by identity would pile up for the whole run.
+        cls.invalidate_middleware_cache()
+        cls.invalidate_view_cache()
+        super(ViewTestCaseMixin, cls).tearDownClass()
 
     def _pre_setup(self, *args, **kwargs):
         super(ViewTestCaseMixin, self)._pre_setup(*args, **kwargs)
         if self.factory_class:
             self.factory = self.factory_class(self.get_middleware_classes())
+        if self.async_factory_class:
+            self.async_factory = self.async_factory_class(self.get_middleware_classes())
 
     def get_view_kwargs(self):
         return self.view_kwargs or {}
@@ -59,6 +441,100 @@ class ViewTestCaseMixin(object):
         self.args = args
         self.kwargs = kwargs
         self._load_middleware()
+        return self._handle_request(request)
+
+    def view_many(self, requests, *args, **kwargs):
+        """
+        Runs each of ``requests`` through middleware and the view with the
+        same arguments, yielding responses one by one.
+
+        Both ``requests`` and the result are consumed lazily, so large
+        batches can be streamed from a generator::
+
+        >>> pages = (self.factory.get(data={'page': n}) for n in range(500))
+        >>> for response in self.view_many(pages):
+        ...     self.assert_status_equal(response, 200)
+        """
+        self._load_middleware()
+        for request in requests:
+            self.args = args
+            self.kwargs = kwargs
+            yield self._handle_request(request)
+
+    async def async_view(self, request, *args, **kwargs):
+        """
+        Asynchronous counterpart of ``view``. Async views and async-capable
+        middleware are awaited directly, sync ones are adapted the same way
+        Django's ASGI handler does it. Requests are usually built with
+        ``self.async_factory`` and awaited from ``async def`` test methods.
+
+        Arguments are kept on the request, so many calls may run
+        concurrently::
+
+        >>> requests = [self.async_factory.get() for _ in range(100)]
+        >>> responses = await asyncio.gather(
+        ...     *(self.async_view(request, pk=1) for request in requests)
+        ... )
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request._djet_view_arguments = (args, kwargs)
+        self._load_middleware(is_async=True)
+        view_timings = self._start_view_timings(request)
+        start = time.perf_counter()
+        response = await self._run_middleware_async(request)
+        if view_timings is not None:
+            self._finish_view_timings(view_timings, response, start)
+        if self.render_lazily:
+            _render_lazily(response)
+
+        return response
+
+    async def _run_middleware_async(self, request):
+        if self.middleware:
+            response = await self._middleware_chain(request)
+        else:
+            response = None
+            for middleware_method in self._request_middleware:
+                response = await middleware_method(request)
+                if response:
+                    break
+
+            if response is None:
+                response = await self._get_response_async(request)
+
+        for middleware_method in self._response_middleware:
+            response = await middleware_method(request, response)
+
+        return response
+
+    def _handle_request(self, request):
+        view_timings = self._start_view_timings(request)
+        start = time.perf_counter()
+        response = self._run_middleware(request)
+        if view_timings is not None:
+            self._finish_view_timings(view_timings, response, start)
+        if self.render_lazily:
+            _render_lazily(response)
+
+        return response
+
+    def _start_view_timings(self, request):
+        view_timings = None
+        if self.record_view_timings or self.profile_view:
+            view_timings = timing.ViewTimings()
+        request._djet_view_timings = view_timings
+        return view_timings
+
+    def _finish_view_timings(self, view_timings, response, start):
+        view_timings.total = time.perf_counter() - start
+        response.view_timings = self.view_timings = view_timings
+        if callable(getattr(response, "render", None)):
+            _extend_response(response, _TimedRenderMixin)
+        else:
+            _extend_response(response, _ViewTimingsMixin)
+
+    def _run_middleware(self, request):
         if self.middleware:
             response = self._middleware_chain(request)
         else:
@@ -76,73 +552,136 @@ class ViewTestCaseMixin(object):
 
         return response
 
-    def _load_middleware(self):
-        self._request_middleware = []
-        self._view_middleware = []
-        self._template_response_middleware = []
-        self._response_middleware = []
-        self._exception_middleware = []
-
-        if self.middleware is None:
-            self._load_old_middleware()
-        else:
-            self._load_new_middleware()
+    @classmethod
+    def invalidate_middleware_cache(cls):
+        """
+        Drops middleware compiled for this test class, so the next request
+        instantiates it again. Call it after mutating middleware
+        configuration (or settings read by middleware) at runtime.
+        """
+        cls._middleware_cache = {}
+
+    def _get_middleware_cache_key(self, is_async=False):
+        middleware = self.middleware
+        if middleware is not None:
+            middleware = tuple(middleware)
+        instrumented = bool(self.record_view_timings or self.profile_view)
+        return (
+            tuple(self.middleware_classes or []),
+            middleware,
+            is_async,
+            instrumented,
+        )
 
-    def _load_old_middleware(self):
+    def _load_middleware(self, is_async=False):
+        cache = self.__class__.__dict__.get("_middleware_cache")
+        if cache is None:
+            self.invalidate_middleware_cache()
+            cache = self.__class__._middleware_cache
+        key = self._get_middleware_cache_key(is_async)
+        compiled = cache.get(key)
+        if compiled is None:
+            compiled = cache[key] = _CompiledMiddleware(*key[2:])
+            if self.middleware is None:
+                self._load_old_middleware(compiled)
+            else:
+                self._load_new_middleware(compiled)
+        compiled.test_case = self
+
+        self._request_middleware = compiled.request_middleware
+        self._view_middleware = compiled.view_middleware
+        self._template_response_middleware = compiled.template_response_middleware
+        self._response_middleware = compiled.response_middleware
+        self._exception_middleware = compiled.exception_middleware
+        self._middleware_chain = compiled.middleware_chain
+
+    def _load_old_middleware(self, compiled):
+        adapt = partial(self._adapt_hook, compiled)
         middleware_classes = self.middleware_classes or []
         for mw_class in middleware_classes:
             mw_class, mw_types = self._unpack_middleware(mw_class)
-            mw_instance = mw_class(self._get_response)
+            mw_instance = mw_class(compiled.get_response)
 
             if self._should_add_middleware(
                 mw_instance, mw_types, MiddlewareType.PROCESS_REQUEST
             ):
-                self._request_middleware.append(mw_instance.process_request)
+                compiled.request_middleware.append(adapt(mw_instance.process_request))
             if self._should_add_middleware(
                 mw_instance, mw_types, MiddlewareType.PROCESS_VIEW
             ):
-                self._view_middleware.append(mw_instance.process_view)
+                compiled.view_middleware.append(adapt(mw_instance.process_view))
             if self._should_add_middleware(
                 mw_instance, mw_types, MiddlewareType.PROCESS_TEMPLATE_RESPONSE
             ):
-                self._template_response_middleware.insert(
-                    0, mw_instance.process_template_response
+                compiled.template_response_middleware.insert(
+                    0, adapt(mw_instance.process_template_response)
                 )
             if self._should_add_middleware(
                 mw_instance, mw_types, MiddlewareType.PROCESS_RESPONSE
             ):
-                self._response_middleware.insert(0, mw_instance.process_response)
+                compiled.response_middleware.insert(
+                    0, adapt(mw_instance.process_response)
+                )
             if self._should_add_middleware(
                 mw_instance, mw_types, MiddlewareType.PROCESS_EXCEPTION
             ):
-                self._exception_middleware.insert(0, mw_instance.process_exception)
+                compiled.exception_middleware.insert(
+                    0, adapt(mw_instance.process_exception)
+                )
 
-    def _load_new_middleware(self):
+    def _load_new_middleware(self, compiled):
         from django.core.handlers.exception import convert_exception_to_response
 
-        handler = convert_exception_to_response(self._get_response)
+        adapt = partial(self._adapt_hook, compiled)
+        if compiled.is_async:
+            handler = convert_exception_to_response(compiled.get_response_async)
+        else:
+            handler = convert_exception_to_response(compiled.get_response)
+        handler_is_async = compiled.is_async
         middleware_classes = reversed(self.middleware or [])
         for mw_class in middleware_classes:
             mw_class, mw_types = self._unpack_middleware(mw_class)
+            mw_is_async = self._is_async_middleware(mw_class, handler_is_async)
+            handler = _adapt_method_mode(mw_is_async, handler, handler_is_async)
             mw_instance = mw_class(handler)
 
             if self._should_add_middleware(
                 mw_instance, mw_types, MiddlewareType.PROCESS_VIEW
             ):
-                self._view_middleware.insert(0, mw_instance.process_view)
+                compiled.view_middleware.insert(0, adapt(mw_instance.process_view))
             if self._should_add_middleware(
                 mw_instance, mw_types, MiddlewareType.PROCESS_TEMPLATE_RESPONSE
             ):
-                self._template_response_middleware.append(
-                    mw_instance.process_template_response
+                compiled.template_response_middleware.append(
+                    adapt(mw_instance.process_template_response)
                 )
             if self._should_add_middleware(
                 mw_instance, mw_types, MiddlewareType.PROCESS_EXCEPTION
             ):
-                self._exception_middleware.append(mw_instance.process_exception)
+                compiled.exception_middleware.append(
+                    adapt(mw_instance.process_exception)
+                )
 
+            if compiled.instrumented:
+                label = "{0}.__call__".format(mw_class.__name__)
+                mw_instance = _timed(mw_instance, label, mw_is_async)
             handler = convert_exception_to_response(mw_instance)
-        self._middleware_chain = handler
+            handler_is_async = mw_is_async
+        compiled.middleware_chain = _adapt_method_mode(
+            compiled.is_async, handler, handler_is_async
+        )
+
+    def _adapt_hook(self, compiled, method):
+        label = "{0}.{1}".format(type(method.__self__).__name__, method.__name__)
+        method = _adapt_method_mode(compiled.is_async, method)
+        if compiled.instrumented:
+            method = _timed(method, label)
+        return method
+
+    def _is_async_middleware(self, mw_class, handler_is_async):
+        if handler_is_async or not getattr(mw_class, "sync_capable", True):
+            return getattr(mw_class, "async_capable", False)
+        return False
 
     def _unpack_middleware(self, mw_class):
         mw_types = None
@@ -170,6 +709,29 @@ class ViewTestCaseMixin(object):
 
         return response
 
+    async def _get_response_async(self, request):
+        args, kwargs = request._djet_view_arguments
+        response = None
+        for middleware_method in self._view_middleware:
+            response = await middleware_method(request, self._run_view, args, kwargs)
+            if response:
+                break
+        if response is None:
+            try:
+                response = await self._run_view_async(request, args, kwargs)
+            except Exception as e:
+                for middleware_method in self._exception_middleware:
+                    response = await middleware_method(request, e)
+                    if response:
+                        break
+                if not response:
+                    raise
+        if hasattr(response, "render") and callable(response.render):
+            for middleware_method in self._template_response_middleware:
+                response = await middleware_method(request, response)
+
+        return response
+
     def _process_exception_by_middleware(self, exception, request):
         for middleware_method in self._exception_middleware:
             response = middleware_method(request, exception)
@@ -185,13 +747,87 @@ class ViewTestCaseMixin(object):
     def _run_view(self, request):
         view = self._get_view(request)
 
-        response = view(request, *self.args, **self.kwargs)
+        view_timings = getattr(request, "_djet_view_timings", None)
+        if view_timings is None:
+            return view(request, *self.args, **self.kwargs)
+        if self.profile_view:
+            profiler = cProfile.Profile()
+            view = partial(profiler.runcall, view)
+        try:
+            response = view_timings.measure(
+                "view", view, request, *self.args, **self.kwargs
+            )
+        finally:
+            if self.profile_view:
+                view_timings.profile = pstats.Stats(profiler)
+
+        return response
+
+    @classmethod
+    def invalidate_view_cache(cls):
+        """
+        Drops view callables created by ``as_view`` for this test class.
+        """
+        cls._view_cache = {}
+
+    def _as_view(self, view_class, **initkwargs):
+        """
+        Returns ``view_class.as_view(**initkwargs)``, reusing the callable
+        for repeated requests with the same plain init kwargs (strings,
+        numbers, classes...). Other kwargs, e.g. model instances or
+        querysets, get a new callable every time.
+        """
+        try:
+            key = (view_class, _freeze(initkwargs))
+            hash(key)
+        except TypeError:
+            return view_class.as_view(**initkwargs)
+
+        cache = self.__class__.__dict__.get("_view_cache")
+        if cache is None:
+            self.invalidate_view_cache()
+            cache = self.__class__._view_cache
+        view = cache.get(key)
+        if view is None:
+            view = cache[key] = view_class.as_view(**initkwargs)
+        return view
+
+    async def _run_view_async(self, request, args, kwargs):
+        view = self._get_view(request)
+        view_timings = request._djet_view_timings
+        profiler = None
+        if view_timings is not None and self.profile_view:
+            profiler = cProfile.Profile()
+
+        is_async = asyncio.iscoroutinefunction(view)
+        if not is_async:
+            if profiler is not None:
+                # Sync views run in a worker thread, profile them there.
+                view = partial(profiler.runcall, view)
+            view = _adapt_method_mode(True, view, False)
+        start = time.perf_counter()
+        try:
+            if profiler is not None and is_async:
+                profiler.enable()
+            response = await view(request, *args, **kwargs)
+            # Before Django 4.1 ``as_view`` of a view with async handlers is a
+            # sync function returning a coroutine.
+            if asyncio.iscoroutine(response):
+                if profiler is not None:
+                    profiler.enable()
+                response = await response
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                view_timings.profile = pstats.Stats(profiler)
+        if view_timings is not None:
+            view_timings.add("view", time.perf_counter() - start)
 
         return response
 
     def _get_view(self, request):
         if self.view_class:
-            view = self.view_class.as_view(**self.get_view_kwargs())
+            view = self._as_view(self.view_class, **self.get_view_kwargs())
         elif self.view_function:
             view = self.__class__.__dict__["view_function"]
         else:
@@ -200,8 +836,80 @@ class ViewTestCaseMixin(object):
         return view
 
 
+RequestOutcome = namedtuple(
+    "RequestOutcome", ["request", "response", "exception", "duration"]
+)
+
+
+class ConcurrentResults(list):
+    """
+    ``RequestOutcome`` of each request passed to ``view_concurrently``,
+    in the same order as the requests.
+    """
+
+    @property
+    def responses(self):
+        return [outcome.response for outcome in self if outcome.exception is None]
+
+    @property
+    def exceptions(self):
+        return [outcome.exception for outcome in self if outcome.exception]
+
+    @property
+    def timings(self):
+        return timing.Timings(outcome.duration for outcome in self)
+
+
 class ViewTransactionTestCase(ViewTestCaseMixin, django_test.TransactionTestCase):
-    pass
+    def view_concurrently(self, requests, *args, max_workers=4, **kwargs):
+        """
+        Runs ``requests`` through the view from a pool of ``max_workers``
+        threads, each with its own database connection, and collects
+        responses, exceptions and durations instead of raising.
+
+        For example::
+
+        >>> results = self.view_concurrently(
+        ...     [self.factory.post() for _ in range(20)], pk=1, max_workers=8
+        ... )
+        >>> self.assertFalse(results.exceptions)
+        >>> self.assertLess(results.timings.percentile(95), 0.2)
+        """
+        self.args = args
+        self.kwargs = kwargs
+        self._load_middleware()
+
+        tasks = queue.Queue()
+        for index, request in enumerate(requests):
+            tasks.put((index, request))
+        results = ConcurrentResults([None] * tasks.qsize())
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        index, request = tasks.get_nowait()
+                    except queue.Empty:
+                        return
+                    results[index] = self._run_timed_request(request)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            workers = [executor.submit(worker) for _ in range(max_workers)]
+            for future in workers:
+                future.result()
+        return results
+
+    def _run_timed_request(self, request):
+        response, exception = None, None
+        start = time.perf_counter()
+        try:
+            response = self._handle_request(request)
+        except Exception as e:
+            exception = e
+        duration = time.perf_counter() - start
+        return RequestOutcome(request, response, exception, duration)
 
 
 class ViewTestCase(ViewTestCaseMixin, django_test.TestCase):
@@ -0,0 +1,96 @@
+import math
+import time
+
+
+class Timings(object):
+    """
+    Durations (in seconds) with summary statistics.
+    """
+
+    def __init__(self, durations=None):
+        self.durations = sorted(durations or [])
+
+    def __len__(self):
+        return len(self.durations)
+
+    def __iter__(self):
+        return iter(self.durations)
+
+    def __repr__(self):
+        if not self.durations:
+            return "<Timings: empty>"
+        return "<Timings: min={0:.2f}ms median={1:.2f}ms p95={2:.2f}ms>".format(
+            self.min * 1000, self.median * 1000, self.percentile(95) * 1000
+        )
+
+    @property
+    def min(self):
+        return self.durations[0]
+
+    @property
+    def max(self):
+        return self.durations[-1]
+
+    @property
+    def mean(self):
+        return sum(self.durations) / len(self.durations)
+
+    @property
+    def median(self):
+        return self.percentile(50)
+
+    def percentile(self, percent):
+        """
+        Returns the given percentile, interpolating linearly between the
+        closest ranks.
+        """
+        if not self.durations:
+            raise ValueError("Cannot compute a percentile of no timings.")
+        position = (len(self.durations) - 1) * percent / 100.0
+        lower, upper = math.floor(position), math.ceil(position)
+        lower_value, upper_value = self.durations[lower], self.durations[upper]
+        return lower_value + (upper_value - lower_value) * (position - lower)
+
+
+class ViewTimings(object):
+    """
+    Wall time (in seconds) spent in parts of a single view call: middleware
+    hooks (labelled ``ClassName.method``), the ``view`` itself and template
+    ``render``. ``profile`` holds ``pstats.Stats`` of the view when it was
+    profiled.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.total = None
+        self.profile = None
+
+    def __contains__(self, label):
+        return any(entry_label == label for entry_label, _ in self.entries)
+
+    def __getitem__(self, label):
+        if label not in self:
+            raise KeyError(label)
+        return sum(
+            duration for entry_label, duration in self.entries if entry_label == label
+        )
+
+    def add(self, label, duration):
+        self.entries.append((label, duration))
+
+    def measure(self, label, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.add(label, time.perf_counter() - start)
+
+    def report(self):
+        labels = []
+        for label, _ in self.entries:
+            if label not in labels:
+                labels.append(label)
+        lines = ["{0}: {1:.3f}ms".format(label, self[label] * 1000) for label in labels]
+        if self.total is not None:
+            lines.append("total: {0:.3f}ms".format(self.total * 1000))
+        return "\n".join(lines)
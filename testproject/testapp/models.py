@@ -8,3 +8,8 @@ class MockModel(models.Model):
 class MockFileModel(models.Model):
     field = models.CharField(max_length=100)
     file = models.FileField(upload_to="files")
+
+
+class MockDataModel(models.Model):
+    number = models.IntegerField(default=0)
+    data = models.JSONField(default=dict)
@@ -1,8 +1,13 @@
+import time
+
 from django.contrib import messages
+from django.contrib.auth.models import Permission, User
+from django.contrib.contenttypes.models import ContentType
 from django.contrib.messages.middleware import MessageMiddleware
 from django.contrib.sessions.middleware import SessionMiddleware
 from django.core import mail
 from django.http import HttpResponse
+from django.template.response import TemplateResponse
 from django.test import TestCase
 from django.views import generic
 from testapp import models
@@ -61,6 +66,23 @@ class StatusCodeAssertionsMixinTest(
         with self.assertRaises(AssertionError):
             self.assert_status_in(response, [401, 404])
 
+    def test_assert_status_code_should_show_body_on_error(self):
+        response = HttpResponse("Invalid data", status=400)
+
+        with self.assertRaisesRegex(AssertionError, "App responded:\n+Invalid data"):
+            self.assert_status_equal(response, 200, show_body_on_error=True)
+        with self.assertRaisesRegex(AssertionError, "App responded:\n+Invalid data"):
+            self.assert_status_in(response, [200], show_body_on_error=True)
+
+    def test_assert_status_code_should_render_template_response_body_on_error(self):
+        request = self.factory.get()
+        response = TemplateResponse(
+            request, "template.html", {"name": "error"}, status=400
+        )
+
+        with self.assertRaisesRegex(AssertionError, "App responded:\n+ error"):
+            self.assert_status_equal(response, 200, show_body_on_error=True)
+
 
 class EmailMockView(generic.View):
     def get(self, *args, **kwargs):
@@ -151,6 +173,133 @@ class MessagesAssertionsMixin(
 
         self.assert_message_exists(request, messages.SUCCESS, "asap urgent")
 
+    def test_assertions_should_not_consume_messages(self):
+        request = self.factory.get(data={"send": "2"})
+        self.view(request)
+
+        self.assert_messages_sent(request, 2)
+        self.assert_message_exists(request, contains="urgent")
+
+        self.assertFalse(messages.get_messages(request).used)
+        self.assertEqual(len(list(messages.get_messages(request))), 2)
+
+
+class NoMessageStorageAssertionsMixinTest(
+    assertions.MessagesAssertionsMixin, testcases.ViewTestCase
+):
+    view_class = MockView
+
+    def test_assertions_should_see_no_messages_without_storage(self):
+        request = self.factory.get()
+
+        self.view(request)
+
+        self.assert_messages_sent(request, 0)
+        self.assert_message_count_matching(request, 0, level=messages.SUCCESS)
+        with self.assertRaises(AssertionError):
+            self.assert_message_exists(request, messages.SUCCESS, "asap urgent")
+
+
+class DetailedMessagesMockView(generic.View):
+    def get(self, request, *args, **kwargs):
+        messages.success(request, "Order 1 saved")
+        messages.success(request, "Order 2 saved", extra_tags="order")
+        messages.warning(request, "Order 3 delayed", extra_tags="order urgent")
+        messages.debug(request, "Not recorded below default level")
+        return HttpResponse()
+
+
+class RecordedMessagesAssertionsMixinTest(
+    assertions.MessagesAssertionsMixin, testcases.ViewTestCase
+):
+    view_class = DetailedMessagesMockView
+
+    def setUp(self):
+        self.request = self.factory.get(messages=True)
+        self.view(self.request)
+
+    def test_messages_should_be_recorded_as_tuples(self):
+        self.assertEqual(
+            messages.get_messages(self.request).records,
+            [
+                (messages.SUCCESS, "Order 1 saved", "success"),
+                (messages.SUCCESS, "Order 2 saved", "order success"),
+                (messages.WARNING, "Order 3 delayed", "order urgent warning"),
+            ],
+        )
+
+    def test_assert_message_exists_should_filter_by_criteria(self):
+        self.assert_message_exists(self.request, messages.SUCCESS, "Order 2 saved")
+        self.assert_message_exists(self.request, tags="urgent order")
+        self.assert_message_exists(self.request, level=messages.WARNING, contains="3")
+
+        with self.assertRaisesRegex(AssertionError, "level=30, contains='saved'"):
+            self.assert_message_exists(
+                self.request, level=messages.WARNING, contains="saved"
+            )
+
+    def test_assert_message_count_matching(self):
+        self.assert_messages_sent(self.request, 3)
+        self.assert_message_count_matching(self.request, 2, level=messages.SUCCESS)
+        self.assert_message_count_matching(self.request, 2, tags="order")
+        self.assert_message_count_matching(self.request, 0, contains="debug")
+
+        with self.assertRaisesRegex(AssertionError, "There was 3 messages"):
+            self.assert_message_count_matching(self.request, 1, contains="Order")
+
+
+class TemplateMockView(generic.View):
+    def get(self, request, *args, **kwargs):
+        return TemplateResponse(
+            request,
+            ["missing.html", "template.html"],
+            {"greeting": "Hello", "name": None},
+        )
+
+
+class ContextAssertionsMixinTest(
+    assertions.ContextAssertionsMixin, testcases.ViewTestCase
+):
+    view_class = TemplateMockView
+
+    def setUp(self):
+        self.response = self.view(self.factory.get())
+
+    def tearDown(self):
+        self.assertFalse(self.response.is_rendered)
+
+    def test_assert_context_contains_should_pass_when_key_in_context(self):
+        self.assert_context_contains(self.response, "greeting")
+        self.assert_context_contains(self.response, "greeting", "Hello")
+        self.assert_context_contains(self.response, "name", None)
+
+    def test_assert_context_contains_should_raise_when_key_not_in_context(self):
+        with self.assertRaisesRegex(AssertionError, "'greeting', 'name'"):
+            self.assert_context_contains(self.response, "user")
+
+    def test_assert_context_contains_should_raise_when_value_differs(self):
+        with self.assertRaisesRegex(AssertionError, "is 'Hello', expected 'Hi'"):
+            self.assert_context_contains(self.response, "greeting", "Hi")
+
+    def test_assert_context_not_contains(self):
+        self.assert_context_not_contains(self.response, "user")
+        with self.assertRaises(AssertionError):
+            self.assert_context_not_contains(self.response, "greeting")
+
+    def test_assert_template_used_should_check_template_names(self):
+        self.assert_template_used(self.response, "template.html")
+        with self.assertRaisesRegex(AssertionError, "'other.html' was not used"):
+            self.assert_template_used(self.response, "other.html")
+
+    def test_assertions_should_raise_when_response_is_not_template_response(self):
+        self.response = TemplateResponse(None, "template.html")
+        response = HttpResponse()
+
+        with self.assertRaisesRegex(AssertionError, "TemplateResponse"):
+            self.assert_context_contains(response, "greeting")
+        with self.assertRaisesRegex(AssertionError, "TemplateResponse"):
+            self.assert_template_used(response, "template.html")
+
 
 class InstanceAssertionsMixinTest(assertions.InstanceAssertionsMixin, TestCase):
     def test_assert_instance_exists_passes_for_existing_instances(self):
@@ -194,3 +343,362 @@ class InstanceAssertionsMixinTest(assertions.InstanceAssertionsMixin, TestCase):
         with self.assertRaisesRegex(AssertionError, "A MockModel was found"):
             with self.assert_instance_deleted(models.MockModel, field="value"):
                 pass
+
+
+class SleepMockView(generic.View):
+    def get(self, *args, **kwargs):
+        time.sleep(float(self.request.GET.get("sleep", 0)))
+        return HttpResponse()
+
+
+class PerformanceAssertionsMixinTest(
+    assertions.PerformanceAssertionsMixin, testcases.ViewTestCase
+):
+    view_class = SleepMockView
+
+    def test_assert_max_duration_passes_when_block_is_fast(self):
+        with self.assert_max_duration(1000) as context:
+            pass
+
+        self.assertLess(context.duration, 1)
+
+    def test_assert_max_duration_raises_assertion_error_when_block_is_slow(self):
+        with self.assertRaisesRegex(AssertionError, "expected at most 1ms"):
+            with self.assert_max_duration(1):
+                time.sleep(0.01)
+
+    def test_assert_view_latency_passes_within_budget(self):
+        timings = self.assert_view_latency(
+            self.factory.get(), p95_ms=1000, median_ms=1000, runs=5, warmup=1
+        )
+
+        self.assertEqual(len(timings), 5)
+
+    def test_assert_view_latency_raises_assertion_error_over_budget(self):
+        request = self.factory.get(data={"sleep": "0.005"})
+
+        with self.assertRaisesRegex(AssertionError, "p95 latency .* over 3 runs"):
+            self.assert_view_latency(request, p95_ms=1, runs=3, warmup=0)
+
+    def test_assert_view_latency_accepts_request_callable(self):
+        requests = []
+
+        def make_request():
+            requests.append(self.factory.get())
+            return requests[-1]
+
+        self.assert_view_latency(make_request, max_ms=1000, runs=2, warmup=1)
+
+        self.assertEqual(len(requests), 3)
+
+
+class QueryMockView(generic.View):
+    def get(self, *args, **kwargs):
+        for instance in models.MockModel.objects.all():
+            models.MockModel.objects.filter(pk=instance.pk).exists()
+        return HttpResponse()
+
+
+class QueryAssertionsMixinTest(
+    assertions.InstanceAssertionsMixin, testcases.ViewTestCase
+):
+    view_class = QueryMockView
+
+    def setUp(self):
+        models.MockModel.objects.create(field="a")
+        models.MockModel.objects.create(field="b")
+
+    def test_assert_max_queries_passes_within_budget(self):
+        with self.assert_max_queries(3) as context:
+            self.view(self.factory.get())
+
+        self.assertEqual(len(context), 3)
+
+    def test_assert_max_queries_raises_assertion_error_with_report(self):
+        with self.assertRaisesRegex(AssertionError, "3 queries .*\n2x "):
+            with self.assert_max_queries(2):
+                self.view(self.factory.get())
+
+    def test_assert_no_duplicate_queries_raises_assertion_error_for_n_plus_one(self):
+        with self.assertRaisesRegex(AssertionError, "more than 1 time"):
+            with self.assert_no_duplicate_queries():
+                self.view(self.factory.get())
+
+    def test_assert_no_duplicate_queries_passes_within_allowed_repeats(self):
+        with self.assert_no_duplicate_queries(max_repeats=2):
+            self.view(self.factory.get())
+
+    def test_query_patterns_should_group_queries_differing_by_parameters(self):
+        with self.assert_max_queries(10) as context:
+            self.view(self.factory.get())
+
+        counts = [count for _, count, _ in context.patterns()]
+        self.assertEqual(counts, [2, 1])
+
+
+class BatchInstanceAssertionsMixinTest(assertions.InstanceAssertionsMixin, TestCase):
+    def test_assert_instances_exist_passes_with_single_query(self):
+        models.MockModel.objects.create(field="a")
+        models.MockModel.objects.create(field="b")
+
+        with self.assertNumQueries(1):
+            self.assert_instances_exist(
+                models.MockModel, [{"field": "a"}, {"field__exact": "b"}]
+            )
+
+    def test_assert_instances_exist_reports_missing_criteria(self):
+        instance = models.MockModel.objects.create(field="a")
+
+        with self.assertRaisesRegex(
+            AssertionError, r"matching 2 of 3 criteria: {'field': 'b'}, {'pk': 0}"
+        ):
+            self.assert_instances_exist(
+                models.MockModel, [{"pk": instance.pk}, {"field": "b"}, {"pk": 0}]
+            )
+
+    def test_assert_instances_exist_queries_json_criteria_one_by_one(self):
+        models.MockDataModel.objects.create(number=3, data={"a": 1})
+
+        self.assert_instances_exist(
+            models.MockDataModel, [{"data": {"a": 1}}, {"number": 3}]
+        )
+        self.assert_instances_do_not_exist(models.MockDataModel, [{"data": {"a": 2}}])
+        with self.assertRaisesRegex(AssertionError, "{'data': {'b': 1}}"):
+            self.assert_instances_exist(
+                models.MockDataModel, [{"data": {"a": 1}}, {"data": {"b": 1}}]
+            )
+
+    def test_assert_instances_exist_chunks_queries(self):
+        for value in "abc":
+            models.MockModel.objects.create(field=value)
+
+        with self.assertNumQueries(2):
+            self.assert_instances_exist(
+                models.MockModel,
+                [{"field": value} for value in "abc"],
+                chunk_size=2,
+            )
+
+    def test_assert_instances_exist_supports_other_lookups(self):
+        models.MockModel.objects.create(field="value")
+
+        self.assert_instances_exist(
+            models.MockModel, [{"field__startswith": "val"}, {"field": "value"}]
+        )
+        with self.assertRaises(AssertionError):
+            self.assert_instances_exist(models.MockModel, [{"field__contains": "x"}])
+
+    def test_assert_instances_exist_matches_related_instances(self):
+        content_type = ContentType.objects.get_for_model(User)
+
+        with self.assertNumQueries(1):
+            self.assert_instances_exist(
+                Permission,
+                [
+                    {"content_type": content_type, "codename": "add_user"},
+                    {"content_type_id": content_type.pk, "codename": "change_user"},
+                ],
+            )
+
+    def test_assert_instances_do_not_exist_reports_found_criteria(self):
+        models.MockModel.objects.create(field="a")
+
+        with self.assertRaisesRegex(AssertionError, "MockModel found matching 1 of 2"):
+            self.assert_instances_do_not_exist(
+                models.MockModel, [{"field": "a"}, {"field": "b"}]
+            )
+
+    def test_assert_instances_created_passes_when_instances_created(self):
+        with self.assert_instances_created(
+            models.MockModel, [{"field": "a"}, {"field": "b"}]
+        ):
+            models.MockModel.objects.create(field="a")
+            models.MockModel.objects.create(field="b")
+
+    def test_assert_instances_created_raises_assertion_error_when_not_created(self):
+        with self.assertRaisesRegex(AssertionError, "No MockModel found matching 1"):
+            with self.assert_instances_created(
+                models.MockModel, [{"field": "a"}, {"field": "b"}]
+            ):
+                models.MockModel.objects.create(field="a")
+
+    def test_assert_instances_deleted_passes_when_instances_deleted(self):
+        models.MockModel.objects.create(field="a")
+
+        with self.assert_instances_deleted(models.MockModel, [{"field": "a"}]):
+            models.MockModel.objects.all().delete()
+
+
+class InstancesChangedAssertionTest(assertions.InstanceAssertionsMixin, TestCase):
+    def setUp(self):
+        self.kept = models.MockModel.objects.create(field="kept")
+        self.changed = models.MockModel.objects.create(field="changed")
+        self.removed = models.MockModel.objects.create(field="removed")
+
+    def test_assert_instances_changed_exposes_changed_primary_keys(self):
+        with self.assert_instances_changed(
+            models.MockModel, created=1, updated=1, deleted=1, fields=["field"]
+        ) as changes:
+            created = models.MockModel.objects.create(field="created")
+            models.MockModel.objects.filter(pk=self.changed.pk).update(field="new")
+            models.MockModel.objects.filter(pk=self.removed.pk).delete()
+
+        self.assertEqual(changes.created, {created.pk})
+        self.assertEqual(changes.updated, {self.changed.pk})
+        self.assertEqual(changes.deleted, {self.removed.pk})
+
+    def test_assert_instances_changed_ignores_updates_without_fields(self):
+        with self.assert_instances_changed(models.MockModel, updated=0) as changes:
+            models.MockModel.objects.update(field="new")
+
+        self.assertEqual(changes.updated, set())
+
+    def test_assert_instances_changed_raises_assertion_error_on_unexpected_delta(
+        self,
+    ):
+        with self.assertRaisesRegex(
+            AssertionError, "0 MockModel instances were created, expected 2"
+        ):
+            with self.assert_instances_changed(models.MockModel, created=2):
+                pass
+
+    def test_assert_instances_changed_streams_rows_in_chunks(self):
+        with self.assert_instances_changed(
+            models.MockModel, deleted=3, chunk_size=1
+        ) as changes:
+            models.MockModel.objects.all().delete()
+
+        self.assertEqual(len(changes.deleted), 3)
+
+    def test_assert_instances_changed_detects_values_with_equal_hashes(self):
+        # hash(-1) == hash(-2) in CPython.
+        instance = models.MockDataModel.objects.create(number=-1)
+
+        with self.assert_instances_changed(
+            models.MockDataModel, updated=1, fields=["number"]
+        ) as changes:
+            models.MockDataModel.objects.update(number=-2)
+
+        self.assertEqual(changes.updated, {instance.pk})
+
+    def test_assert_instances_changed_compares_unhashable_values(self):
+        instance = models.MockDataModel.objects.create(data={"a": [1]})
+        models.MockDataModel.objects.create(data={"b": 2})
+
+        with self.assert_instances_changed(
+            models.MockDataModel, updated=1, fields=["data"]
+        ) as changes:
+            models.MockDataModel.objects.filter(pk=instance.pk).update(
+                data={"a": [1, 2]}
+            )
+
+        self.assertEqual(changes.updated, {instance.pk})
+
+
+class IndexedEmailAssertionsMixinTest(assertions.EmailAssertionsMixin, TestCase):
+    def send(self, subject, to):
+        mail.send_mail(subject, "body", "glados@aperture.edu", [to])
+
+    def test_assert_email_exists_finds_emails_sent_after_previous_lookup(self):
+        self.send("first", "a@example.com")
+        self.assert_email_exists(subject="first")
+
+        self.send("second", "b@example.com")
+
+        self.assert_email_exists(subject="second", to=["b@example.com"])
+        with self.assertRaises(AssertionError):
+            self.assert_email_exists(subject="second", to=["a@example.com"])
+
+    def test_assert_email_exists_reindexes_replaced_outbox(self):
+        self.send("first", "a@example.com")
+        self.assert_email_exists(subject="first")
+
+        mail.outbox = []
+        self.send("second", "a@example.com")
+
+        with self.assertRaises(AssertionError):
+            self.assert_email_exists(subject="first")
+        self.assert_email_exists(subject="second", body="body")
+
+    def test_assert_email_exists_reindexes_outbox_cleared_in_place(self):
+        self.send("A", "a@example.com")
+        self.send("B", "b@example.com")
+        self.assert_email_exists(subject="A")
+
+        mail.outbox.clear()
+        self.send("C", "c@example.com")
+        self.send("D", "d@example.com")
+
+        self.assert_email_exists(subject="C")
+        self.assert_email_exists(subject="D", to=["d@example.com"])
+        with self.assertRaises(AssertionError):
+            self.assert_email_exists(subject="A")
+
+    def test_assert_emails_exist_passes_when_all_criteria_matched(self):
+        for index in range(50):
+            self.send("mail {0}".format(index), "{0}@example.com".format(index))
+
+        self.assert_emails_exist(
+            [
+                {
+                    "subject": "mail {0}".format(index),
+                    "to": ("{0}@example.com".format(index),),
+                }
+                for index in range(50)
+            ]
+        )
+
+    def test_assert_emails_exist_reports_missing_criteria(self):
+        self.send("first", "a@example.com")
+
+        with self.assertRaisesRegex(
+            AssertionError, "matching 1 of 2 criteria was sent: {'subject': 'nope'}"
+        ):
+            self.assert_emails_exist([{"subject": "first"}, {"subject": "nope"}])
+
+
+class EmailLookupsAssertionsMixinTest(assertions.EmailAssertionsMixin, TestCase):
+    def setUp(self):
+        email = mail.EmailMessage(
+            "Order #123 confirmed",
+            "Thanks for your order",
+            "shop@example.com",
+            ["you@example.com", "Boss@example.com"],
+        )
+        email.attach("invoice.pdf", b"x" * 2048, "application/pdf")
+        email.send()
+        mail.send_mail("Newsletter", "news", "shop@example.com", ["you@example.com"])
+
+    def test_assert_email_exists_supports_lookups(self):
+        self.assert_email_exists(
+            subject__contains="#123",
+            body__icontains="THANKS",
+            to__contains="you@example.com",
+            to__icontains="boss@example.com",
+            from_email__in=["shop@example.com", "other@example.com"],
+            subject__regex=r"^Order #\d+",
+            subject__startswith="Order",
+            attachment_names__endswith=".pdf",
+            attachment_sizes__gte=2048,
+            attachment_count=1,
+        )
+
+    def test_assert_email_exists_raises_assertion_error_with_near_misses(self):
+        with self.assertRaisesRegex(
+            AssertionError,
+            r"Closest matches:\nEmail 'Order #123 confirmed' .* fails: "
+            r"attachment_count=2 \(got 1\)",
+        ):
+            self.assert_email_exists(subject__startswith="Order", attachment_count=2)
+
+    def test_assert_email_count_matching_passes_when_count_matches(self):
+        self.assert_email_count_matching(2, to__contains="you@example.com")
+        self.assert_email_count_matching(0, subject__regex="^Invoice")
+
+    def test_assert_email_count_matching_raises_assertion_error_on_other_count(self):
+        with self.assertRaisesRegex(AssertionError, "1 e-mails matching criteria"):
+            self.assert_email_count_matching(2, attachment_sizes__gt=1024)
+
+    def test_unsupported_lookup_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            self.assert_email_exists(subject__unknown="x")
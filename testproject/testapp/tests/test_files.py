@@ -1,13 +1,18 @@
+import hashlib
 import os
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 from django.core.files.storage import default_storage
+from django.test import RequestFactory
 from django.test.testcases import TestCase
+from django.utils import timezone
 
 from djet import files
 
 try:
-    import PIL
+    import PIL.Image
 except ImportError:
     PIL = None
 
@@ -25,6 +30,94 @@ class InMemoryFilesTestCase(TestCase):
 
         self.assertEqual(file.name, "test.png")
 
+    @unittest.skipUnless(PIL, "PIL is not installed")
+    def test_make_inmemory_jpeg_image_from_jpg_file_name(self):
+        file = files.create_inmemory_image(
+            "photo.jpg", width=10, height=10, color=(0, 0, 255), mode="RGB"
+        )
+
+        self.assertEqual(file.content_type, "image/jpeg")
+        self.assertEqual(PIL.Image.open(file).format, "JPEG")
+
+    @unittest.skipUnless(PIL, "PIL is not installed")
+    def test_inmemory_images_should_be_encoded_once(self):
+        files._encode_image.cache_clear()
+
+        first = files.create_inmemory_image("first.png", width=10, height=10)
+        second = files.create_inmemory_image("second.png", width=10, height=10)
+        content = first.read()
+
+        self.assertEqual(files._encode_image.cache_info().misses, 1)
+        self.assertEqual(second.read(), content)
+        self.assertEqual(second.name, "second.png")
+        self.assertEqual(second.size, len(content))
+
+    @unittest.skipUnless(PIL, "PIL is not installed")
+    def test_inmemory_image_should_have_given_color_and_mode(self):
+        file = files.create_inmemory_image(
+            "test.png", width=10, height=5, color=(0, 255, 0), mode="RGB"
+        )
+
+        image = PIL.Image.open(file)
+
+        self.assertEqual(image.mode, "RGB")
+        self.assertEqual(image.size, (10, 5))
+        self.assertEqual(image.getpixel((0, 0)), (0, 255, 0))
+
+
+class GeneratedFilesTestCase(TestCase):
+    def test_generated_file_should_repeat_pattern(self):
+        file = files.create_generated_file("test.bin", size=10, pattern=b"abc")
+
+        self.assertEqual(file.name, "test.bin")
+        self.assertEqual(file.size, 10)
+        self.assertEqual(file.read(), b"abcabcabca")
+
+    def test_generated_file_should_be_seekable(self):
+        file = files.create_generated_file(size=200 * 1024, pattern=b"0123456789")
+
+        file.seek(100 * 1024 + 3)
+
+        self.assertEqual(file.read(12), b"345678901234")
+        file.seek(-4, os.SEEK_END)
+        self.assertEqual(file.read(), b"6789")
+
+    def test_generated_file_should_yield_chunks_of_given_size(self):
+        file = files.create_generated_file(size=200 * 1024, chunk_size=64 * 1024)
+
+        chunks = list(file.chunks())
+
+        self.assertEqual([len(chunk) for chunk in chunks], [65536] * 3 + [8192])
+        self.assertEqual(b"".join(chunks), b"djet" * 50 * 1024)
+
+    def test_generated_file_should_be_saved_in_storage(self):
+        storage = files.InMemoryStorage(spool_threshold=1024)
+        file = files.create_generated_file("test.bin", size=4096, pattern=b"ab")
+
+        storage.save("test.bin", file)
+
+        self.assertTrue(storage.is_spilled("test.bin"))
+        self.assertEqual(storage.open("test.bin").read(), b"ab" * 2048)
+
+    def test_inmemory_files_should_be_created_in_batch(self):
+        created_files = files.create_inmemory_files(
+            3, "upload{0}.bin", factory=files.create_generated_file, size=5
+        )
+
+        self.assertEqual(
+            [file.name for file in created_files],
+            ["upload0.bin", "upload1.bin", "upload2.bin"],
+        )
+        self.assertEqual([file.read() for file in created_files], [b"djetd"] * 3)
+
+    def test_inmemory_files_should_be_uploaded_in_one_request(self):
+        request = RequestFactory().post(
+            "/", {"files": files.create_inmemory_files(3, content=b"data")}
+        )
+
+        self.assertEqual(len(request.FILES.getlist("files")), 3)
+        self.assertEqual(request.FILES.getlist("files")[2].name, "tmp2.txt")
+
 
 class InMemoryStorageTestCase(files.InMemoryStorageMixin, TestCase):
     def setUp(self):
@@ -46,10 +139,27 @@ class InMemoryStorageTestCase(files.InMemoryStorageMixin, TestCase):
     def test_file_should_exist_when_saved(self):
         self.assertTrue(default_storage.exists(self.file_name))
 
-    def test_file_should_be_the_same_when_opened(self):
+    def test_file_should_have_the_same_content_when_opened(self):
         uploaded_file = default_storage.open(self.file_name)
 
-        self.assertEqual(uploaded_file, self.file)
+        self.assertEqual(uploaded_file.read(), b"Avada Kedavra")
+
+    def test_opened_files_should_have_independent_cursors(self):
+        first = default_storage.open(self.file_name)
+        second = default_storage.open(self.file_name)
+
+        first.read(5)
+        default_storage.size(self.file_name)
+
+        self.assertEqual(first.read(), b" Kedavra")
+        self.assertEqual(second.read(), b"Avada Kedavra")
+
+    def test_stored_content_should_not_change_when_opened_file_is_written(self):
+        opened_file = default_storage.open(self.file_name)
+
+        opened_file.write(b"Expelliarmus")
+
+        self.assertEqual(default_storage.open(self.file_name).read(), b"Avada Kedavra")
 
     def test_file_should_be_deleted(self):
         default_storage.delete(self.file_name)
@@ -76,3 +186,264 @@ class InMemoryStorageTestCase(files.InMemoryStorageMixin, TestCase):
         size = default_storage.size(self.file_name)
 
         self.assertEqual(size, len(self.file))
+
+
+class SpoolingInMemoryStorageTestCase(files.InMemoryStorageMixin, TestCase):
+    storage_kwargs = {"spool_threshold": 10, "max_memory_size": 15}
+
+    def save(self, name, content):
+        default_storage.save(name, files.create_inmemory_file(name, content))
+
+    def test_file_above_threshold_should_be_spilled(self):
+        self.save("big.txt", b"x" * 11)
+
+        self.assertTrue(default_storage.is_spilled("big.txt"))
+        self.assertEqual(default_storage.memory_size, 0)
+        self.assertEqual(default_storage.open("big.txt").read(), b"x" * 11)
+        self.assertEqual(default_storage.size("big.txt"), 11)
+
+    def test_spilled_files_should_have_independent_cursors(self):
+        self.save("big.txt", b"0123456789ab")
+        first = default_storage.open("big.txt")
+        second = default_storage.open("big.txt")
+
+        first.seek(10)
+
+        self.assertEqual(first.read(), b"ab")
+        self.assertEqual(second.read(4), b"0123")
+        self.assertEqual(list(second.chunks(chunk_size=8)), [b"01234567", b"89ab"])
+
+    def test_least_recently_used_file_should_be_spilled_over_memory_budget(self):
+        self.save("a.txt", b"a" * 6)
+        self.save("b.txt", b"b" * 6)
+        default_storage.open("a.txt")
+
+        self.save("c.txt", b"c" * 6)
+
+        self.assertTrue(default_storage.is_spilled("b.txt"))
+        self.assertFalse(default_storage.is_spilled("a.txt"))
+        self.assertFalse(default_storage.is_spilled("c.txt"))
+        self.assertEqual(default_storage.memory_size, 12)
+        self.assertEqual(default_storage.open("b.txt").read(), b"b" * 6)
+
+    def test_deleting_file_should_release_memory(self):
+        self.save("a.txt", b"a" * 6)
+        self.save("big.txt", b"x" * 11)
+
+        default_storage.delete("a.txt")
+        default_storage.delete("big.txt")
+
+        self.assertEqual(default_storage.memory_size, 0)
+        self.assertFalse(default_storage.exists("big.txt"))
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "requires /proc")
+    def test_spilled_files_should_share_one_file_descriptor(self):
+        open_fds = len(os.listdir("/proc/self/fd"))
+
+        for index in range(2000):
+            self.save("big{0}.txt".format(index), b"x" * 11)
+
+        self.assertTrue(default_storage.is_spilled("big1999.txt"))
+        self.assertLessEqual(len(os.listdir("/proc/self/fd")), open_fds + 1)
+        default_storage.clear()
+        self.assertEqual(len(os.listdir("/proc/self/fd")), open_fds)
+
+    def test_open_spilled_file_should_stay_readable_after_delete(self):
+        self.save("big.txt", b"0123456789ab")
+        spilled_file = default_storage.open("big.txt")
+
+        default_storage.delete("big.txt")
+        self.save("other.txt", b"x" * 11)
+
+        self.assertEqual(spilled_file.read(), b"0123456789ab")
+        self.assertEqual(default_storage.open("other.txt").read(), b"x" * 11)
+
+
+class InMemoryStorageTreeTestCase(files.InMemoryStorageMixin, TestCase):
+    def setUp(self):
+        for name in ["a/b/one.txt", "a/b/two.txt", "a/c/three.txt", "root.txt"]:
+            default_storage.save(name, files.create_inmemory_file(name, b"data"))
+
+    def test_listdir_should_return_directory_entries(self):
+        self.assertEqual(default_storage.listdir(""), (["a"], ["root.txt"]))
+        self.assertEqual(default_storage.listdir("a"), (["b", "c"], []))
+        self.assertEqual(default_storage.listdir("a/b/"), ([], ["one.txt", "two.txt"]))
+        self.assertEqual(default_storage.listdir("missing"), ([], []))
+
+    def test_exists_should_find_directories(self):
+        self.assertTrue(default_storage.exists("a/b"))
+        self.assertFalse(default_storage.exists("a/d"))
+
+    def test_delete_should_remove_empty_directories(self):
+        default_storage.delete("a/c/three.txt")
+
+        self.assertFalse(default_storage.exists("a/c"))
+        self.assertEqual(default_storage.listdir("a"), (["b"], []))
+
+    def test_walk_should_yield_directories_top_down(self):
+        self.assertEqual(
+            list(default_storage.walk("a")),
+            [
+                ("a", ["b", "c"], []),
+                ("a/b", [], ["one.txt", "two.txt"]),
+                ("a/c", [], ["three.txt"]),
+            ],
+        )
+
+
+class InMemoryStorageMetadataTestCase(files.InMemoryStorageMixin, TestCase):
+    def save(self, name, content=b"data", **kwargs):
+        return default_storage.save(
+            name, files.create_inmemory_file(name, content), **kwargs
+        )
+
+    def test_times_should_be_recorded_when_saved(self):
+        before = timezone.now()
+        self.save("file.txt")
+        after = timezone.now()
+
+        created_time = default_storage.get_created_time("file.txt")
+        self.assertTrue(before <= created_time <= after)
+        self.assertEqual(default_storage.get_modified_time("file.txt"), created_time)
+
+    def test_accessed_time_should_change_when_opened(self):
+        self.save("file.txt")
+        modified_time = default_storage.get_modified_time("file.txt")
+
+        default_storage.open("file.txt").close()
+
+        self.assertGreater(default_storage.get_accessed_time("file.txt"), modified_time)
+        self.assertEqual(default_storage.get_modified_time("file.txt"), modified_time)
+
+    def test_overwriting_file_should_keep_created_time(self):
+        self.save("file.txt")
+        created_time = default_storage.get_created_time("file.txt")
+
+        default_storage._save("file.txt", files.create_inmemory_file(content=b"new"))
+
+        self.assertEqual(default_storage.get_created_time("file.txt"), created_time)
+        self.assertGreater(default_storage.get_modified_time("file.txt"), created_time)
+
+    def test_content_hash_should_be_sha256_of_content(self):
+        self.save("file.txt", b"Avada Kedavra")
+
+        self.assertEqual(
+            default_storage.content_hash("file.txt"),
+            hashlib.sha256(b"Avada Kedavra").hexdigest(),
+        )
+
+    def test_taken_names_should_be_numbered(self):
+        names = [self.save("dir/file.txt") for _ in range(3)]
+
+        self.assertEqual(names, ["dir/file.txt", "dir/file_1.txt", "dir/file_2.txt"])
+
+    def test_numbered_name_taken_by_other_file_should_be_skipped(self):
+        self.save("file.txt")
+        self.save("file_1.txt")
+
+        self.assertEqual(self.save("file.txt"), "file_2.txt")
+
+    def test_name_too_long_should_be_truncated(self):
+        self.save("abcdefghijkl.txt")
+
+        name = self.save("abcdefghijkl.txt", max_length=16)
+
+        self.assertEqual(len(name), 16)
+        self.assertTrue(name.startswith("abcd_"))
+
+
+class DeduplicatingInMemoryStorageTestCase(files.InMemoryStorageMixin, TestCase):
+    storage_kwargs = {"deduplicate": True}
+
+    def save(self, name, content):
+        return default_storage.save(name, files.create_inmemory_file(name, content))
+
+    def test_files_with_same_content_should_be_stored_once(self):
+        for index in range(3):
+            self.save("avatar{0}.png".format(index), b"image")
+        self.save("other.png", b"other")
+
+        stats = default_storage.stats()
+
+        self.assertEqual(stats.files, 4)
+        self.assertEqual(stats.logical_size, 20)
+        self.assertEqual(stats.unique_size, 10)
+        self.assertEqual(stats.dedup_ratio, 2.0)
+        self.assertEqual(default_storage.memory_size, 10)
+        self.assertEqual(default_storage.open("avatar2.png").read(), b"image")
+
+    def test_content_should_be_released_when_last_file_is_deleted(self):
+        self.save("first.png", b"image")
+        self.save("second.png", b"image")
+
+        default_storage.delete("first.png")
+
+        self.assertEqual(default_storage.stats().unique_size, 5)
+        self.assertEqual(default_storage.open("second.png").read(), b"image")
+
+        default_storage.delete("second.png")
+
+        self.assertEqual(default_storage.stats(), (0, 0, 0, 1.0))
+        self.assertEqual(default_storage.memory_size, 0)
+
+    def test_storage_without_deduplication_should_store_every_copy(self):
+        storage = files.InMemoryStorage()
+        for name in ["first.png", "second.png"]:
+            storage.save(name, files.create_inmemory_file(name, b"image"))
+
+        self.assertEqual(storage.stats(), (2, 10, 10, 1.0))
+
+
+class ThreadSafeInMemoryStorageTestCase(files.InMemoryStorageMixin, TestCase):
+    storage = files.ThreadSafeInMemoryStorage
+
+    def test_files_saved_in_other_threads_should_be_visible(self):
+        def save(index):
+            name = "dir/{0}.txt".format(index)
+            return default_storage.save(name, files.create_inmemory_file(name, b"x"))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            names = list(executor.map(save, range(50)))
+
+        self.assertEqual(len(set(names)), 50)
+        self.assertEqual(len(default_storage.listdir("dir")[1]), 50)
+        self.assertEqual(default_storage.open("dir/0.txt").read(), b"x")
+
+
+class SQLiteStorageTestCase(files.InMemoryStorageMixin, TestCase):
+    storage = files.SQLiteStorage
+
+    def setUp(self):
+        for name in ["a/b/one.txt", "a/two.txt"]:
+            default_storage.save(name, files.create_inmemory_file(name, b"data"))
+
+    def test_saved_file_should_be_readable(self):
+        self.assertTrue(default_storage.exists("a/b/one.txt"))
+        self.assertEqual(default_storage.open("a/b/one.txt").read(), b"data")
+        self.assertEqual(default_storage.size("a/b/one.txt"), 4)
+
+    def test_listdir_and_exists_should_see_directories(self):
+        self.assertEqual(default_storage.listdir(""), (["a"], []))
+        self.assertEqual(default_storage.listdir("a/"), (["b"], ["two.txt"]))
+        self.assertTrue(default_storage.exists("a/b"))
+        self.assertFalse(default_storage.exists("a/c"))
+
+    def test_files_should_be_visible_to_other_storage_on_same_location(self):
+        other_storage = files.SQLiteStorage(location=default_storage.location)
+
+        thread = threading.Thread(
+            target=other_storage.save,
+            args=("c.txt", files.create_inmemory_file("c.txt", b"from thread")),
+        )
+        thread.start()
+        thread.join()
+
+        self.assertEqual(default_storage.open("c.txt").read(), b"from thread")
+        self.assertEqual(other_storage.open("a/two.txt").read(), b"data")
+
+    def test_deleted_file_should_not_exist(self):
+        default_storage.delete("a/two.txt")
+
+        self.assertFalse(default_storage.exists("a/two.txt"))
+        with self.assertRaises(FileNotFoundError):
+            default_storage.open("a/two.txt")
@@ -1,5 +1,5 @@
 from django import test as django_test
-from django.contrib.auth.models import User
+from django.contrib.auth.models import AnonymousUser, User
 from django.core.handlers.wsgi import WSGIRequest
 from rest_framework import (
     authentication,
@@ -40,6 +40,28 @@ class APIRequestFactoryTest(django_test.TestCase):
         self.assertEqual(request.user, user_mock)
         self.assertEqual(request._force_auth_user, user_mock)
 
+    def test_request_template_should_force_authenticate_user(self):
+        user_mock = User.objects.create_user(
+            username="test_user", email="test@example.com"
+        )
+
+        request = self.factory.template("get", user=user_mock)()
+
+        self.assertEqual(request._force_auth_user, user_mock)
+
+    def test_request_template_should_force_authenticate_token(self):
+        user_mock = User.objects.create_user(
+            username="test_user", email="test@example.com"
+        )
+        template = self.factory.template("get", user=user_mock, token="token")
+
+        request = template()
+        other_request = template(user=AnonymousUser())
+
+        self.assertEqual(request._force_auth_user, user_mock)
+        self.assertEqual(request._force_auth_token, "token")
+        self.assertEqual(other_request._force_auth_token, "token")
+
 
 class MockModelSerializer(serializers.ModelSerializer):
     class Meta:
@@ -178,3 +200,12 @@ class TestAPIViewTestCase(djet_restframework.APIViewTestCase):
         response = self.view(request, pk=pk)
 
         self.assertEqual(response.data, "test {}".format(pk))
+
+    def test_viewset_view_should_be_cached_per_actions(self):
+        list_view = self._get_view(self.factory.get(actions={"get": "list"}))
+        retrieve_view = self._get_view(self.factory.get(actions={"get": "retrieve"}))
+
+        self.assertIs(
+            list_view, self._get_view(self.factory.get(actions={"get": "list"}))
+        )
+        self.assertIsNot(list_view, retrieve_view)
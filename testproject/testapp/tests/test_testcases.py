@@ -1,10 +1,20 @@
+import asyncio
+import pickle
+
 from django import test as django_test
+from django.contrib import messages
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
 from django.core.handlers.wsgi import WSGIRequest
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseNotAllowed
+from django.middleware.cache import FetchFromCacheMiddleware, UpdateCacheMiddleware
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
 from django.template.response import TemplateResponse
 from django.views import generic
+from testapp import models
 
-from djet import testcases
+from djet import assertions, sessions, testcases
 
 
 class MockMiddleware(object):
@@ -68,6 +78,126 @@ class RequestFactoryTest(django_test.TestCase):
         self.assertEqual(request.method, "PATCH")
 
 
+class MessagesMockView(generic.View):
+    def get(self, request, *args, **kwargs):
+        request.session["visits"] = request.session.get("visits", 0) + 1
+        messages.success(request, "Visit {0}".format(request.session["visits"]))
+        return HttpResponse()
+
+
+class SessionAndMessagesRequestFactoryTest(
+    assertions.MessagesAssertionsMixin, testcases.ViewTestCase
+):
+    view_class = MessagesMockView
+
+    def test_request_should_have_in_memory_session_with_given_data(self):
+        request = self.factory.get(session={"visits": 1}, messages=True)
+
+        self.view(request)
+
+        self.assertIsInstance(request.session, sessions.SessionStore)
+        self.assertEqual(request.session["visits"], 2)
+
+    def test_request_should_have_in_memory_message_storage(self):
+        request = self.factory.get(session={}, messages=True)
+
+        self.view(request)
+
+        self.assert_message_exists(request, messages.SUCCESS, "Visit 1")
+        self.assert_messages_sent(request, 1)
+
+    def test_request_should_have_no_session_nor_messages_by_default(self):
+        request = self.factory.get()
+
+        self.assertFalse(hasattr(request, "session"))
+        self.assertFalse(hasattr(request, "_messages"))
+
+    def test_session_should_be_saved_and_cycled_without_backend(self):
+        request = self.factory.get(session={"visits": 1})
+
+        request.session.save()
+        key = request.session.session_key
+        request.session.cycle_key()
+
+        self.assertIsNotNone(key)
+        self.assertNotEqual(request.session.session_key, key)
+        self.assertEqual(request.session["visits"], 1)
+        request.session.flush()
+        self.assertIsNone(request.session.session_key)
+        self.assertNotIn("visits", request.session)
+
+    def test_request_template_should_attach_new_session_to_every_request(self):
+        template = self.factory.template("get", session={"visits": 1}, messages=True)
+        first, second = template(), template()
+
+        self.view(first)
+
+        self.assertEqual(first.session["visits"], 2)
+        self.assertEqual(second.session["visits"], 1)
+        self.assert_messages_sent(second, 0)
+
+
+class RequestTemplateTest(django_test.TestCase):
+    def setUp(self):
+        self.factory = testcases.RequestFactory()
+
+    def test_template_should_create_new_requests(self):
+        template = self.factory.template("get", path="/list/", data={"q": "djet"})
+
+        first, second = template(), template()
+
+        self.assertIsNot(first, second)
+        self.assertIsNot(first.META, second.META)
+        self.assertIsInstance(first, WSGIRequest)
+        self.assertEqual(first.path, "/list/")
+        self.assertEqual(second.GET.dict(), {"q": "djet"})
+
+    def test_template_should_merge_query_parameters(self):
+        template = self.factory.template("get", data={"q": "djet", "page": 1})
+
+        request = template(query={"page": 2, "tag": ["a", "b"]})
+
+        self.assertEqual(request.GET["q"], "djet")
+        self.assertEqual(request.GET["page"], "2")
+        self.assertEqual(request.GET.getlist("tag"), ["a", "b"])
+        self.assertEqual(template().GET["page"], "1")
+
+    def test_template_should_reuse_body_for_every_request(self):
+        template = self.factory.template("post", data={"title": "Hello"})
+
+        requests = [template(), template()]
+
+        self.assertEqual([request.POST["title"] for request in requests], ["Hello"] * 2)
+
+    def test_template_should_set_user_and_extra_environ(self):
+        template = self.factory.template("get", user="default")
+
+        request = template(user="other", HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+
+        self.assertEqual(template().user, "default")
+        self.assertEqual(request.user, "other")
+        self.assertEqual(request.headers["X-Requested-With"], "XMLHttpRequest")
+        self.assertNotIn("HTTP_X_REQUESTED_WITH", template().META)
+
+    def test_async_template_should_create_asgi_requests(self):
+        template = testcases.AsyncRequestFactory().template("post", data={"a": "1"})
+
+        request = template(
+            query={"page": 2},
+            HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+            HTTP_HOST="example.com",
+            REMOTE_USER="glados",
+        )
+
+        self.assertIsInstance(request, ASGIRequest)
+        self.assertEqual(request.GET["page"], "2")
+        self.assertEqual(request.POST["a"], "1")
+        self.assertEqual(request.headers["X-Requested-With"], "XMLHttpRequest")
+        self.assertEqual(request.META["HTTP_HOST"], "example.com")
+        self.assertEqual(request.META["REMOTE_USER"], "glados")
+        self.assertNotIn("HTTP_X_REQUESTED_WITH", template().META)
+
+
 class MockView(generic.View):
     def mock_method(self):
         self.mock_method_called = True
@@ -90,6 +220,23 @@ class TemplateResponseMockView(generic.View):
         return TemplateResponse(request, "template.html")
 
 
+class ContextTemplateResponseMockView(generic.View):
+    def get(self, request, *args, **kwargs):
+        context = {"greeting": "Hello", "name": kwargs.get("name")}
+        return TemplateResponse(request, "template.html", context)
+
+
+class RenderableResponse(HttpResponse):
+    def render(self):
+        self.rendered = True
+        return self
+
+
+class RenderableResponseMockView(generic.View):
+    def get(self, request, *args, **kwargs):
+        return RenderableResponse()
+
+
 def mock_function_view(request):
     return HttpResponse(status=200)
 
@@ -248,3 +395,451 @@ class NoViewClassDefined(testcases.ViewTestCase):
 
         with self.assertRaises(Exception):
             self.view(request)
+
+
+class CountingMiddleware(object):
+    instances = 0
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        CountingMiddleware.instances += 1
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+
+class MiddlewareCacheTest(testcases.ViewTestCase):
+    view_class = MockView
+    middleware = [CountingMiddleware]
+
+    def setUp(self):
+        self.invalidate_middleware_cache()
+        CountingMiddleware.instances = 0
+
+    def test_middleware_should_be_instantiated_once_for_many_requests(self):
+        for _ in range(3):
+            self.view(self.factory.get())
+
+        self.assertEqual(CountingMiddleware.instances, 1)
+
+    def test_invalidate_middleware_cache_should_instantiate_middleware_again(self):
+        self.view(self.factory.get())
+
+        self.invalidate_middleware_cache()
+        self.view(self.factory.get())
+
+        self.assertEqual(CountingMiddleware.instances, 2)
+
+    def test_changed_middleware_should_not_use_cached_middleware(self):
+        self.view(self.factory.get())
+
+        self.middleware = [NewStyleMiddleware, CountingMiddleware]
+        response = self.view(self.factory.get())
+
+        self.assertTrue(response.new_middleware)
+        self.assertEqual(CountingMiddleware.instances, 2)
+
+
+class ViewCacheTest(testcases.ViewTestCase):
+    view_class = KwargsMockView
+    view_kwargs = {"test": "test"}
+
+    def setUp(self):
+        self.invalidate_view_cache()
+
+    def test_get_view_should_reuse_view_callable(self):
+        request = self.factory.get()
+
+        self.assertIs(self._get_view(request), self._get_view(request))
+
+    def test_get_view_should_not_reuse_view_callable_when_kwargs_changed(self):
+        request = self.factory.get()
+        view = self._get_view(request)
+
+        self.view_kwargs = {"test": "changed"}
+
+        self.assertIsNot(self._get_view(request), view)
+        self.assertEqual(self.view(request), "changed")
+
+    def test_get_view_should_work_with_unhashable_kwargs(self):
+        self.view_kwargs = {"test": {"a", "b"}}
+
+        response = self.view(self.factory.get())
+
+        self.assertEqual(response, {"a", "b"})
+
+    def test_get_view_should_not_reuse_view_callable_for_equal_values_of_other_type(
+        self,
+    ):
+        self.view_kwargs = {"test": {"value": 1}}
+        self.view(self.factory.get())
+
+        self.view_kwargs = {"test": {"value": True}}
+        response = self.view(self.factory.get())
+
+        self.assertIs(response["value"], True)
+
+    def test_get_view_should_not_reuse_view_callable_for_model_instances(self):
+        self.view_kwargs = {"test": models.MockModel(pk=1, field="first")}
+        self.view(self.factory.get())
+        second = models.MockModel(pk=1, field="second")
+
+        self.view_kwargs = {"test": second}
+        response = self.view(self.factory.get())
+
+        self.assertIs(response, second)
+
+    def test_tear_down_class_should_clear_caches(self):
+        class CachingTestCase(testcases.ViewSimpleTestCase):
+            view_class = KwargsMockView
+            view_kwargs = {"test": "test"}
+
+            def runTest(self):
+                pass
+
+        CachingTestCase.setUpClass()
+        test_case = CachingTestCase()
+        test_case._pre_setup()
+        test_case.view(test_case.factory.get())
+        test_case._post_teardown()
+        self.assertTrue(CachingTestCase._view_cache)
+        self.assertTrue(CachingTestCase._middleware_cache)
+
+        CachingTestCase.tearDownClass()
+
+        self.assertEqual(CachingTestCase._view_cache, {})
+        self.assertEqual(CachingTestCase._middleware_cache, {})
+
+
+class QueryParamMockView(generic.View):
+    def get(self, request, *args, **kwargs):
+        response = HttpResponse(request.GET.get("page"))
+        response.view_kwargs = kwargs
+        return response
+
+
+class ViewManyTest(testcases.ViewTestCase):
+    view_class = QueryParamMockView
+    middleware_classes = [MockMiddleware]
+
+    def test_view_many_should_return_response_for_each_request(self):
+        requests = [self.factory.get(data={"page": page}) for page in range(3)]
+
+        responses = list(self.view_many(requests, pk=1))
+
+        self.assertEqual([r.content for r in responses], [b"0", b"1", b"2"])
+        for request, response in zip(requests, responses):
+            self.assertTrue(request.process_request_was_here)
+            self.assertTrue(response.process_response_was_here)
+            self.assertEqual(response.view_kwargs, {"pk": 1})
+
+    def test_view_many_should_consume_requests_lazily(self):
+        built = []
+
+        def requests():
+            for page in range(3):
+                built.append(page)
+                yield self.factory.get(data={"page": page})
+
+        responses = self.view_many(requests())
+
+        self.assertEqual(built, [])
+        next(responses)
+        self.assertEqual(built, [0])
+
+
+async def mock_async_function_view(request, pk=None):
+    await asyncio.sleep(0)
+    response = HttpResponse(str(pk))
+    response.async_view_was_here = True
+    return response
+
+
+class AsyncMockView(generic.View):
+    async def get(self, request, *args, **kwargs):
+        await asyncio.sleep(0)
+        return HttpResponse("async")
+
+
+class AsyncNewStyleMiddleware(object):
+    sync_capable = False
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    async def __call__(self, request):
+        response = await self.get_response(request)
+        response.async_middleware = True
+        return response
+
+
+class AsyncViewTestCaseTest(testcases.ViewTestCase):
+    view_function = mock_async_function_view
+    middleware = [AsyncNewStyleMiddleware, NewStyleMiddleware]
+
+    def test_async_factory_should_create_asgi_request(self):
+        request = self.async_factory.get()
+
+        self.assertIsInstance(request, ASGIRequest)
+
+    async def test_async_view_should_await_view_and_middleware(self):
+        request = self.async_factory.get()
+
+        response = await self.async_view(request, pk=1)
+
+        self.assertEqual(response.content, b"1")
+        self.assertTrue(response.async_view_was_here)
+        self.assertTrue(response.async_middleware)
+        self.assertTrue(response.new_middleware)
+
+    async def test_async_view_should_keep_arguments_of_concurrent_requests(self):
+        requests = [self.async_factory.get() for _ in range(5)]
+
+        responses = await asyncio.gather(
+            *(self.async_view(request, pk=pk) for pk, request in enumerate(requests))
+        )
+
+        self.assertEqual(
+            [response.content for response in responses],
+            [b"0", b"1", b"2", b"3", b"4"],
+        )
+
+
+class AsyncClassViewTestCaseTest(testcases.ViewTestCase):
+    view_class = AsyncMockView
+    middleware_classes = [MockMiddleware]
+
+    async def test_async_view_should_process_request_by_old_style_middleware(self):
+        request = self.async_factory.get()
+
+        response = await self.async_view(request)
+
+        self.assertEqual(response.content, b"async")
+        self.assertTrue(request.process_request_was_here)
+        self.assertTrue(response.process_response_was_here)
+
+
+class AsyncProcessExceptionMiddlewareTest(testcases.ViewTestCase):
+    view_class = RaiseExceptionMockView
+    middleware_classes = [MockMiddleware]
+
+    async def test_async_view_should_process_exception_by_middleware(self):
+        request = self.async_factory.get()
+
+        response = await self.async_view(request)
+
+        self.assertTrue(response.process_exception_was_here)
+
+
+class CountMockView(generic.View):
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("fail"):
+            raise ValueError("fail")
+        return HttpResponse(str(models.MockModel.objects.count()))
+
+
+class ViewConcurrentlyTest(testcases.ViewTransactionTestCase):
+    view_class = CountMockView
+    middleware_classes = [MockMiddleware]
+
+    def test_view_concurrently_should_return_outcome_for_each_request(self):
+        models.MockModel.objects.create(field="value")
+        requests = [self.factory.get() for _ in range(10)]
+
+        results = self.view_concurrently(requests, max_workers=4)
+
+        self.assertEqual([outcome.request for outcome in results], requests)
+        self.assertEqual(len(results.responses), 10)
+        self.assertFalse(results.exceptions)
+        for response in results.responses:
+            self.assertEqual(response.content, b"1")
+            self.assertTrue(response.process_response_was_here)
+
+
+class ViewConcurrentlyWithoutMiddlewareTest(testcases.ViewTransactionTestCase):
+    view_class = CountMockView
+
+    def test_view_concurrently_should_collect_exceptions_and_timings(self):
+        requests = [self.factory.get(data={"fail": "1"}), self.factory.get()]
+
+        results = self.view_concurrently(requests, max_workers=2)
+
+        self.assertEqual(len(results.exceptions), 1)
+        self.assertIsInstance(results.exceptions[0], ValueError)
+        self.assertEqual(len(results.timings), 2)
+        self.assertGreaterEqual(results.timings.percentile(95), results.timings.min)
+
+
+class ViewTimingsTest(testcases.ViewTestCase):
+    view_class = RenderableResponseMockView
+    middleware_classes = [MockMiddleware]
+    record_view_timings = True
+
+    def test_view_should_record_timings_of_middleware_and_view(self):
+        request = self.factory.get()
+
+        response = self.view(request)
+
+        self.assertIs(response.view_timings, self.view_timings)
+        for label in [
+            "MockMiddleware.process_request",
+            "MockMiddleware.process_template_response",
+            "MockMiddleware.process_response",
+            "view",
+        ]:
+            self.assertIn(label, response.view_timings)
+            self.assertLessEqual(response.view_timings[label], self.view_timings.total)
+        self.assertIn("view:", self.view_timings.report())
+
+    def test_render_should_be_recorded_when_called(self):
+        response = self.view(self.factory.get())
+        self.assertNotIn("render", self.view_timings)
+
+        response.render()
+
+        self.assertIn("render", self.view_timings)
+
+    def test_view_timings_should_not_be_recorded_when_disabled(self):
+        self.record_view_timings = False
+
+        response = self.view(self.factory.get())
+
+        self.assertFalse(hasattr(response, "view_timings"))
+
+
+class NewStyleMiddlewareViewTimingsTest(testcases.ViewTestCase):
+    view_class = MockView
+    middleware = [NewStyleMiddleware]
+    profile_view = True
+
+    def test_view_should_record_middleware_call_and_profile(self):
+        response = self.view(self.factory.get())
+
+        self.assertTrue(response.new_middleware)
+        self.assertIn("NewStyleMiddleware.__call__", response.view_timings)
+        self.assertIsNotNone(response.view_timings.profile)
+
+    def test_profiled_response_should_be_pickled_without_view_timings(self):
+        response = self.view(self.factory.get())
+
+        unpickled = pickle.loads(pickle.dumps(response))
+
+        self.assertIs(type(unpickled), HttpResponseNotAllowed)
+        self.assertEqual(unpickled.content, response.content)
+        self.assertFalse(hasattr(unpickled, "view_timings"))
+
+
+class AsyncViewProfileTest(testcases.ViewTestCase):
+    view_class = AsyncMockView
+    profile_view = True
+
+    def get_function_names(self, profile):
+        return {function_name for _, _, function_name in profile.stats}
+
+    async def test_async_view_should_be_profiled(self):
+        response = await self.async_view(self.async_factory.get(), pk=1)
+
+        self.assertIn("view", response.view_timings)
+        self.assertIn("get", self.get_function_names(response.view_timings.profile))
+
+    async def test_sync_view_should_be_profiled_in_async_view(self):
+        self.view_class = MockView
+
+        response = await self.async_view(self.async_factory.get())
+
+        self.assertIn("get", self.get_function_names(response.view_timings.profile))
+
+
+class LazyRenderViewTestCaseTest(testcases.ViewTestCase):
+    view_class = ContextTemplateResponseMockView
+    render_lazily = True
+
+    def test_template_response_should_be_rendered_when_content_accessed(self):
+        request = self.factory.get()
+
+        response = self.view(request, name="World")
+
+        self.assertFalse(response.is_rendered)
+        self.assertIsInstance(response, TemplateResponse)
+        self.assertEqual(response.content, b"Hello World\n")
+        self.assertTrue(response.is_rendered)
+
+    def test_template_response_should_be_rendered_when_iterated(self):
+        request = self.factory.get()
+
+        response = self.view(request, name="World")
+
+        self.assertEqual(b"".join(response), b"Hello World\n")
+
+    def test_render_should_not_change_content_set_before(self):
+        request = self.factory.get()
+        response = self.view(request, name="World")
+
+        response.content = b"Replaced"
+
+        self.assertEqual(response.content, b"Replaced")
+        self.assertEqual(response.render().content, b"Replaced")
+
+    def test_lazy_response_should_be_pickled_as_original_class(self):
+        response = self.view(self.factory.get(), name="World")
+
+        unpickled = pickle.loads(pickle.dumps(response))
+
+        self.assertIs(type(unpickled), TemplateResponse)
+        self.assertEqual(unpickled.content, b"Hello World\n")
+        self.assertTrue(response.is_rendered)
+
+    def test_profiled_response_should_be_pickled_without_view_timings(self):
+        self.profile_view = True
+        response = self.view(self.factory.get(), name="World")
+
+        unpickled = pickle.loads(pickle.dumps(response))
+
+        self.assertIs(type(unpickled), TemplateResponse)
+        self.assertEqual(unpickled.content, b"Hello World\n")
+        self.assertFalse(hasattr(unpickled, "view_timings"))
+        self.assertIn("render", response.view_timings)
+        self.assertIsNotNone(response.view_timings.profile)
+
+    def test_lazy_response_should_be_cached_by_cache_middleware(self):
+        self.addCleanup(cache.clear)
+        request = self.factory.get()
+        fetch_middleware = FetchFromCacheMiddleware(lambda request: None)
+        fetch_middleware.process_request(request)
+        response = self.view(request, name="World")
+
+        update_middleware = UpdateCacheMiddleware(lambda request: None)
+        update_middleware.process_response(request, response).render()
+
+        cached = fetch_middleware.process_request(self.factory.get())
+        self.assertEqual(cached.content, b"Hello World\n")
+
+
+class CachedTemplatesViewTestCaseTest(testcases.ViewTestCase):
+    view_class = ContextTemplateResponseMockView
+    cache_templates = True
+
+    def test_templates_should_be_compiled_once(self):
+        engine = engines["django"].engine
+        (loader,) = engine.template_loaders
+
+        for name in ["first", "second"]:
+            response = self.view(self.factory.get(), name=name)
+            response.render()
+
+        self.assertIsInstance(loader, CachedLoader)
+        self.assertIn("template.html", loader.get_template_cache)
+        self.assertEqual(response.content, b"Hello second\n")
+
+    def test_restoring_template_loaders_should_drop_cached_loader(self):
+        engine = engines["django"].engine
+        replaced = self._replaced_template_loaders
+
+        testcases._restore_template_loaders(replaced)
+        try:
+            self.assertNotIsInstance(engine.template_loaders[0], CachedLoader)
+        finally:
+            self.__class__._replaced_template_loaders = (
+                testcases._cache_template_loaders()
+            )
@@ -0,0 +1,45 @@
+from django.test import SimpleTestCase
+
+from djet import timing
+
+
+class TimingsTest(SimpleTestCase):
+    def test_summary_statistics(self):
+        timings = timing.Timings([0.4, 0.1, 0.3, 0.2, 0.5])
+
+        self.assertEqual(timings.min, 0.1)
+        self.assertEqual(timings.max, 0.5)
+        self.assertAlmostEqual(timings.mean, 0.3)
+        self.assertEqual(timings.median, 0.3)
+
+    def test_percentile_should_interpolate_between_ranks(self):
+        timings = timing.Timings([1.0, 2.0])
+
+        self.assertEqual(timings.percentile(0), 1.0)
+        self.assertEqual(timings.percentile(95), 1.95)
+        self.assertEqual(timings.percentile(100), 2.0)
+
+    def test_percentile_of_no_timings_should_raise_value_error(self):
+        with self.assertRaises(ValueError):
+            timing.Timings().percentile(50)
+
+
+class ViewTimingsTest(SimpleTestCase):
+    def test_getitem_should_sum_durations_of_label(self):
+        view_timings = timing.ViewTimings()
+
+        view_timings.add("view", 0.25)
+        view_timings.add("view", 0.5)
+
+        self.assertEqual(view_timings["view"], 0.75)
+        with self.assertRaises(KeyError):
+            view_timings["render"]
+
+    def test_measure_should_return_result_and_record_duration(self):
+        view_timings = timing.ViewTimings()
+
+        result = view_timings.measure("render", lambda value: value, "content")
+
+        self.assertEqual(result, "content")
+        self.assertIn("render", view_timings)
+        self.assertIn("render:", view_timings.report())